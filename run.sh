@@ -68,6 +68,19 @@ else
     warn "No .venv found — using system Python. Consider: python3 -m venv .venv && pip install -r requirements.txt"
 fi
 
+# ── 1a. Quantized Ollama model (config/ollama/Modelfile) ──────────────────────
+# llm.quant in config.yaml selects lara-q4km (default) or the lara-q8 fallback.
+if command -v ollama &>/dev/null; then
+    if ! ollama list 2>/dev/null | grep -q "^lara-q4km"; then
+        log "Building Q4_K_M LaRa model (one-time)…"
+        ollama create lara-q4km -q q4_K_M -f config/ollama/Modelfile \
+            && ok "lara-q4km built" \
+            || warn "Could not build lara-q4km — set llm.quant: \"\" to use the base model"
+    fi
+else
+    warn "ollama not found — LLM responses will fail until Ollama is running"
+fi
+
 # ── 2. LaRa Python Pipeline (src/main.py) ─────────────────────────────────────
 # Pipeline boots all singletons and starts the WebSocket bridge.
 # The conversation loop is GATED — it only starts when the UI sends session_start.
@@ -5,7 +5,7 @@ import time
 # Add src to path
 sys.path.append(os.path.join(os.getcwd(), "src"))
 
-from mood.mood_detector import MoodDetector, Mood, PRECOMPILED_PATTERNS, MOOD_KEYWORDS, _keyword_match_count
+from mood.mood_detector import MoodDetector, Mood, _NORM, _keyword_counts
 
 def generate_cases():
     """Generates thousands of test cases via combinatorial expansion."""
@@ -85,7 +85,7 @@ def run_mass_test():
     mixed_debug_done = 0
     
     for text, expected, category in cases:
-        detector._mood_history.clear()
+        detector.reset_history()
         detector._current_mood = Mood.NEUTRAL
         
         # Test the analyze path
@@ -102,7 +102,7 @@ def run_mass_test():
             msg = f"[{category}] '{text}' -> got {mood}, expected {expected} (conf: {conf:.3f})"
             if category == "mixed" and mixed_debug_done < 5:
                 text_lower = text.lower()
-                scores = {m: _keyword_match_count(PRECOMPILED_PATTERNS[m], text_lower) / len(MOOD_KEYWORDS[m]) for m in MOOD_KEYWORDS}
+                scores = {m: n * _NORM[m] for m, n in _keyword_counts(text_lower).items()}
                 msg += f" | Scores: { {m: round(s, 4) for m, s in scores.items() if s > 0} }"
                 mixed_debug_done += 1
             failures.append(msg)
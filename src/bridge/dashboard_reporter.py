@@ -273,14 +273,14 @@ def _build_emotional_data(session, mood_detector) -> dict:
     }
     
     # Override with real data if available
-    if mood_detector and hasattr(mood_detector, '_mood_history'):
-        history = mood_detector._mood_history
+    if mood_detector and hasattr(mood_detector, 'get_mood_history'):
+        history = mood_detector.get_mood_history()
         if history:
             # Calculate emotion percentages from history
             total = len(history)
             mood_counts = {}
             for entry in history:
-                mood = entry.get('mood', 'neutral') if isinstance(entry, dict) else str(entry)
+                mood = entry[0] if isinstance(entry, tuple) else str(entry)
                 mood_counts[mood] = mood_counts.get(mood, 0) + 1
             
             for mood, count in mood_counts.items():
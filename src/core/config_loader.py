@@ -6,7 +6,9 @@ All modules import CONFIG from here instead of hard-coding values.
 
 import os
 import sys
+import pickle
 import logging
+from types import SimpleNamespace
 
 try:
     import yaml
@@ -14,14 +16,50 @@ except ImportError:
     print("ERROR: PyYAML not installed. Run: pip install pyyaml")
     sys.exit(1)
 
+# libyaml C accelerator when available (~10x faster than the pure-Python loader)
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 # ── Locate config file ─────────────────────────────────────────────────────────
 _SRC_DIR    = os.path.dirname(os.path.abspath(__file__))
 _ROOT_DIR   = os.path.dirname(_SRC_DIR)
 _ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 _CONFIG_PATH = os.path.join(os.path.dirname(_ROOT_DIR), "config", "config.yaml")
+_CACHE_PATH  = _CONFIG_PATH + ".pkl"   # Parsed-config cache, keyed on config.yaml (mtime_ns, size)
+
+
+def _cache_key(path: str) -> tuple:
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
 
+def _load_cached(path: str, cache_path: str):
+    """Return the pickled config if it was built from the current YAML file, else None."""
+    try:
+        with open(cache_path, "rb") as f:
+            key, data = pickle.load(f)
+        if key == _cache_key(path):
+            return data
+    except (OSError, EOFError, ValueError, TypeError, pickle.UnpicklingError):
+        pass  # Missing, unreadable or old-format cache: re-parse the YAML
+    return None
 
-def _load_config(path: str) -> dict:
+
+def _write_cache(path: str, cache_path: str, data: dict):
+    """Pickle data next to the YAML; written to a temp file and renamed so readers never see a partial file."""
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            pickle.dump((_cache_key(path), data), f, protocol=5)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        # Read-only checkout — YAML path still works
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def _load_config(path: str, cache_path: str = None) -> dict:
     """Load and return the raw YAML config dict."""
     if not os.path.exists(path):
         raise FileNotFoundError(
@@ -29,10 +67,16 @@ def _load_config(path: str) -> dict:
             f"Expected at: {path}\n"
             "Create config/config.yaml in the project root."
         )
+    if cache_path:
+        data = _load_cached(path, cache_path)
+        if isinstance(data, dict):
+            return data
     with open(path, "r") as f:
-        data = yaml.safe_load(f)
+        data = yaml.load(f, Loader=_YamlLoader)
     if not isinstance(data, dict):
         raise ValueError(f"Config file is empty or malformed: {path}")
+    if cache_path:
+        _write_cache(path, cache_path, data)
     return data
 
 
@@ -52,19 +96,20 @@ def _validate(cfg: dict):
         )
 
 
-class _Config:
+class _Config(SimpleNamespace):
     """
     Dot-access wrapper around the yaml config dict.
     Access nested keys with: CONFIG.llm.model_name
+
+    Built on types.SimpleNamespace so each section is populated by a single
+    C-level __init__ call instead of a setattr per key.
     """
     def __init__(self, data: dict):
+        super().__init__(**{
+            key: _Config(val) if isinstance(val, dict) else val
+            for key, val in data.items()
+        })
         self._data = data
-        # Create sub-section accessors
-        for key, val in data.items():
-            if isinstance(val, dict):
-                setattr(self, key, _Config(val))
-            else:
-                setattr(self, key, val)
 
     def get(self, key, default=None):
         return self._data.get(key, default)
@@ -74,7 +119,7 @@ class _Config:
 
 
 # ── Singleton ──────────────────────────────────────────────────────────────────
-_raw = _load_config(_CONFIG_PATH)
+_raw = _load_config(_CONFIG_PATH, _CACHE_PATH)
 _validate(_raw)
 CONFIG = _Config(_raw)
 
@@ -4,8 +4,11 @@ Provides consistent key=value structured log formatting across all modules.
 Configures root logger based on config.yaml settings.
 """
 
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 import sys
 import time
 
@@ -59,16 +62,59 @@ class StructuredFormatter(logging.Formatter):
         logging.CRITICAL: "CRIT ",
     }
 
-    def format(self, record: logging.LogRecord) -> str:
-        ts = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(record.created))
-        level = self.LEVEL_LABELS.get(record.levelno, "INFO ")
-        msg = record.getMessage()
-        return f"{ts} | {level} | {msg}"
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # (whole second, formatted timestamp) of the last record; strftime only
+        # reruns when the second changes. One tuple, swapped in a single
+        # assignment, so a reader never pairs a second with another's string.
+        self._last_ts = (-1, "")
 
+    def format(self, record: logging.LogRecord) -> str:
+        sec = int(record.created)
+        last_sec, stamp = self._last_ts
+        if sec != last_sec:
+            stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(sec))
+            self._last_ts = (sec, stamp)
+        return "%s | %s | %s" % (
+            stamp,
+            self.LEVEL_LABELS.get(record.levelno, "INFO "),
+            record.getMessage(),
+        )
+
+
+class _BufferedFileHandler(logging.StreamHandler):
+    """
+    StreamHandler over a 64 KiB-buffered file. Records are only flushed on
+    WARNING+ (so crashes stay visible) or when the buffer fills / at shutdown,
+    instead of one write+flush per record like logging.FileHandler.
+    """
 
-def _build_handler(filename: str, level: int) -> logging.FileHandler:
-    """Build a file handler with structured formatter."""
-    handler = logging.FileHandler(filename, encoding="utf-8")
+    def __init__(self, filename: str, buffering: int = 1 << 16):
+        super().__init__(open(filename, "a", encoding="utf-8", buffering=buffering))
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+            if record.levelno >= logging.WARNING:
+                self.stream.flush()
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        self.acquire()
+        try:
+            try:
+                self.flush()
+                self.stream.close()
+            finally:
+                super().close()
+        finally:
+            self.release()
+
+
+def _build_handler(filename: str, level: int) -> logging.Handler:
+    """Build a buffered file handler with structured formatter."""
+    handler = _BufferedFileHandler(filename)
     handler.setLevel(level)
     handler.setFormatter(StructuredFormatter())
     return handler
@@ -84,9 +130,36 @@ def _build_console_handler(level: int) -> logging.StreamHandler:
 
 # ── Setup ─────────────────────────────────────────────────────────────────────
 
+_listener = None  # QueueListener draining records to the real handlers
+
+
+def shutdown_logging():
+    """
+    Drain the log queue and flush the file/console handlers.
+    Must run before os._exit(), which skips atexit; safe to call repeatedly.
+    Records logged afterwards go straight to the handlers, synchronously.
+    """
+    global _listener
+    listener, _listener = _listener, None
+    if listener is None:
+        return
+    listener.stop()  # Joins the thread after it drains the queue
+    root = logging.getLogger()
+    for h in list(root.handlers):
+        if isinstance(h, logging.handlers.QueueHandler):
+            root.removeHandler(h)
+    for h in listener.handlers:
+        h.flush()
+        root.addHandler(h)
+
+
+# Runs before logging.shutdown() (registered earlier), which then closes the files
+atexit.register(shutdown_logging)
+
+
 def setup_logging(log_dir: str = None):
     """
-    Configure the root logger with file + console handlers.
+    Configure the root logger with file + console handlers behind a queue.
     Call this once at startup (from main.py).
 
     Args:
@@ -96,43 +169,32 @@ def setup_logging(log_dir: str = None):
     root = logging.getLogger()
     root.setLevel(LOG_LEVEL)
 
-    # Remove any pre-existing handlers (from basicConfig calls)
-    root.handlers.clear()
+    # Remove any pre-existing handlers (from basicConfig or an earlier setup)
+    shutdown_logging()
+    for h in list(root.handlers):
+        root.removeHandler(h)
+        h.close()
 
     # Use runtime_paths for log file locations
     system_path = get_log_path(SYSTEM_LOG)
     interaction_path = get_log_path(INTERACTION_LOG)
 
-    root.addHandler(_build_handler(system_path, LOG_LEVEL))
-    root.addHandler(_build_handler(interaction_path, logging.INFO))
-    root.addHandler(_build_console_handler(logging.WARNING))
+    # Formatting and file I/O run on the listener thread; the hot path only
+    # enqueues the record.
+    global _listener
+    log_queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(
+        log_queue,
+        _build_handler(system_path, LOG_LEVEL),
+        _build_handler(interaction_path, logging.INFO),
+        _build_console_handler(logging.WARNING),
+        respect_handler_level=True,
+    )
+    _listener.start()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
 
     logging.info(
         f"[Logger] setup complete | level={logging.getLevelName(LOG_LEVEL)} "
         f"system_log={system_path}"
     )
 
-
-# ── Component Logger Helper ───────────────────────────────────────────────────
-
-def get_logger(component: str) -> logging.Logger:
-    """
-    Get a named logger for a component.
-    Produces structured logs like: [SessionState] mood=frustrated conf=0.72
-
-    Usage:
-        log = get_logger("SessionState")
-        log.info(f"mood={mood} conf={conf}")
-        # → 2026-02-27 10:00:00 | INFO  | [SessionState] mood=frustrated conf=0.72
-    """
-    logger = logging.getLogger(component)
-
-    class _PrefixFilter(logging.Filter):
-        def filter(self, record):
-            record.msg = f"[{component}] {record.msg}"
-            return True
-
-    if not logger.filters:
-        logger.addFilter(_PrefixFilter())
-
-    return logger
@@ -1,32 +1,56 @@
 """
 LaRa Metrics — Latency Tracking
 Collects timing data for every stage of the pipeline.
-Writes to lara_metrics.log in CSV format for easy analysis.
+Writes fixed-size binary records into an mmap-backed ring file
+(lara_metrics.ring); dump_csv() decodes it to CSV for analysis.
+
+Instrumented stages: STT, Mood and TTS in the speech_to_text turn loop.
 
 Usage:
-    from metrics import Timer
+    from src.core.metrics import Timer
     with Timer("STT"):
         text = model.transcribe(audio)
-    # → Logs: 2026-02-27 10:00:00 | STT | 0.823s
+    # → dump_csv(): 2026-02-27 10:00:00,STT,0.8230
 """
 
+import atexit
+import mmap
+import struct
 import time
 import logging
 import os
-import csv
+import threading
 from contextlib import contextmanager
 from collections import defaultdict
+from dataclasses import dataclass
 from typing import Optional
 
-from src.core.config_loader import CONFIG
 from src.core.runtime_paths import get_log_path
 
-_METRICS_LOG = "lara_metrics.log"
-_METRICS_PATH = get_log_path(_METRICS_LOG)
+_METRICS_RING = "lara_metrics.ring"
+_METRICS_PATH = get_log_path(_METRICS_RING)
+_STAGES_PATH = get_log_path("lara_metrics.stages")  # One stage name per line; line no. = stage_id
 
 
 # ── In-memory summary ──────────────────────────────────────────────────────────
-_timings: dict[str, list[float]] = defaultdict(list)
+@dataclass
+class _StageStats:
+    """Running count/sum/min/max for one stage — O(1) memory per stage."""
+    count: int = 0
+    total: float = 0.0
+    mn: float = float("inf")
+    mx: float = float("-inf")
+
+    def add(self, elapsed: float):
+        self.count += 1
+        self.total += elapsed
+        if elapsed < self.mn:
+            self.mn = elapsed
+        if elapsed > self.mx:
+            self.mx = elapsed
+
+
+_timings: dict[str, _StageStats] = defaultdict(_StageStats)
 
 
 @contextmanager
@@ -46,20 +70,132 @@ def Timer(stage: str):
         yield
     finally:
         elapsed = time.perf_counter() - start
-        _timings[stage].append(elapsed)
+        _timings[stage].add(elapsed)
         _log_timing(stage, elapsed)
 
 
+class _MetricsRing:
+    """
+    Circular buffer of 16-byte records (uint64 ts_ns, uint32 stage_id,
+    float32 elapsed_s) in an mmap-backed file. A write is one struct.pack_into
+    into mapped memory; the kernel writes dirty pages back in the background.
+    Header: magic, capacity, and the total number of records ever written.
+    """
+
+    MAGIC = b"LRM1"
+    HEADER = struct.Struct("<4sIQ")
+    RECORD = struct.Struct("<QIf")
+    CAPACITY = 65536  # 1 MiB of records
+
+    def __init__(self, path: str, stages_path: str):
+        self._path = path
+        self._stages_path = stages_path
+        self._map = None  # Mapped on first write; the log dir may not exist at import
+        self._next = 0
+        self._stage_ids: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _open(self):
+        size = self.HEADER.size + self.RECORD.size * self.CAPACITY
+        fd = os.open(self._path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size != size:
+                os.ftruncate(fd, size)
+            self._map = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        magic, capacity, written = self.HEADER.unpack_from(self._map, 0)
+        self._next = written if magic == self.MAGIC and capacity == self.CAPACITY else 0
+        try:
+            with open(self._stages_path, encoding="utf-8") as f:
+                self._stage_ids = {name: i for i, name in enumerate(f.read().splitlines())}
+        except FileNotFoundError:
+            self._stage_ids = {}
+
+    def _stage_id(self, stage: str) -> int:
+        sid = self._stage_ids.get(stage)
+        if sid is None:
+            sid = len(self._stage_ids)
+            # Persist the name first: ids are line numbers in the stages file,
+            # so a failed write must not leave an id the file doesn't have
+            with open(self._stages_path, "a", encoding="utf-8") as f:
+                f.write(stage + "\n")
+            self._stage_ids[stage] = sid
+        return sid
+
+    def write(self, stage: str, elapsed_s: float):
+        with self._lock:
+            try:
+                if self._map is None:
+                    self._open()
+                offset = self.HEADER.size + (self._next % self.CAPACITY) * self.RECORD.size
+                self.RECORD.pack_into(self._map, offset, time.time_ns(), self._stage_id(stage), elapsed_s)
+                self._next += 1
+                self.HEADER.pack_into(self._map, 0, self.MAGIC, self.CAPACITY, self._next)
+            except Exception:
+                pass
+
+    def records(self):
+        """Yield (ts_ns, stage, elapsed_s) oldest-first."""
+        with self._lock:
+            if self._map is None:
+                try:
+                    self._open()
+                except OSError:
+                    return
+            names = {i: name for name, i in self._stage_ids.items()}
+            end = self._next
+            start = max(0, end - self.CAPACITY)
+            rows = [
+                self.RECORD.unpack_from(self._map, self.HEADER.size + (i % self.CAPACITY) * self.RECORD.size)
+                for i in range(start, end)
+            ]
+        for ts_ns, sid, elapsed in rows:
+            yield ts_ns, names.get(sid, str(sid)), elapsed
+
+    def flush(self):
+        with self._lock:
+            if self._map is not None:
+                self._map.flush()
+
+    def close(self):
+        with self._lock:
+            if self._map is not None:
+                self._map.flush()
+                self._map.close()
+                self._map = None
+
+
+_ring = _MetricsRing(_METRICS_PATH, _STAGES_PATH)
+atexit.register(_ring.close)
+
+
 def _log_timing(stage: str, elapsed_s: float):
-    """Write a timing entry to the metrics log."""
-    ts = time.strftime("%Y-%m-%d %H:%M:%S")
-    line = f"{ts},{stage},{elapsed_s:.4f}"
-    try:
-        with open(_METRICS_PATH, "a", encoding="utf-8") as f:
-            f.write(line + "\n")
-    except Exception:
-        pass
-    logging.debug(f"[Metrics] stage={stage} duration={elapsed_s:.3f}s")
+    """Append a timing record to the metrics ring."""
+    _ring.write(stage, elapsed_s)
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        logging.debug("[Metrics] stage=%s duration=%.3fs", stage, elapsed_s)
+
+
+def flush():
+    """Write dirty metrics-ring pages to disk (e.g. before shutdown)."""
+    _ring.flush()
+
+
+def dump_csv(path: Optional[str] = None) -> str:
+    """
+    Decode the metrics ring to CSV (timestamp,stage,duration_s), oldest first.
+    Writes to path if given; always returns the CSV text.
+    """
+    lines = [
+        f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(ts_ns / 1e9))},{stage},{elapsed:.4f}\n"
+        for ts_ns, stage, elapsed in _ring.records()
+    ]
+    text = "".join(lines)
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+    return text
 
 
 def get_summary() -> dict[str, dict]:
@@ -74,13 +210,13 @@ def get_summary() -> dict[str, dict]:
         }
     """
     summary = {}
-    for stage, times in _timings.items():
-        if times:
+    for stage, st in _timings.items():
+        if st.count:
             summary[stage] = {
-                "avg":   round(sum(times) / len(times), 3),
-                "min":   round(min(times), 3),
-                "max":   round(max(times), 3),
-                "count": len(times),
+                "avg":   round(st.total / st.count, 3),
+                "min":   round(st.mn, 3),
+                "max":   round(st.mx, 3),
+                "count": st.count,
             }
     return summary
 
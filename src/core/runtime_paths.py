@@ -12,7 +12,10 @@ Default runtime root:
 
 Directory layout (auto-created on import):
     <runtime_root>/
-        logs/           lara_system.log, lara_interaction.log, lara_metrics.log
+        logs/           lara_system.log, lara_interaction.log,
+                        lara_metrics.log (PerformanceMonitor per-turn text),
+                        lara_metrics.ring + .stages (Timer stage timings,
+                        binary; decode with src.core.metrics.dump_csv)
         memory/         lara_memory.db, chroma.sqlite3, lara_vector_store/
         sessions/       (reserved for future session persistence)
         models/         whisper models, YOLO weights, etc.
@@ -68,7 +71,7 @@ def get_log_path(filename: str) -> str:
 
 
 def get_metrics_log_path() -> str:
-    """Return absolute path for the metrics log."""
+    """Return absolute path for the PerformanceMonitor per-turn metrics log."""
     return os.path.join(RUNTIME_ROOT, "logs", "lara_metrics.log")
 
 
@@ -5,6 +5,7 @@ LaRa Main Entrypoint — Pipeline is GATED (starts on UI session_start click)
 
 import sys
 import os
+import select
 import signal
 import logging
 import threading
@@ -22,20 +23,30 @@ except Exception as e:
     print(f"[LaRa] FATAL: Config error — {e}"); os._exit(1)
 
 try:
-    from src.core.logger import setup_logging
+    from src.core.logger import setup_logging, shutdown_logging
     setup_logging()
 except Exception as e:
     print(f"[LaRa] FATAL: Logging failed — {e}"); os._exit(1)
 
 _shutdown_requested = False
+_shutdown_event = threading.Event()
+_wait_loop_running = False   # Set once boot is done and the idle wait loop owns shutdown
 
 def _handle_signal(sig, frame):
+    """
+    During boot: exit at once (nothing to flush yet). Once the wait loop runs:
+    only flag shutdown; the loop wakes (via the wakeup fd) and exits cleanly.
+    """
     global _shutdown_requested
+    if not _wait_loop_running:
+        print("\n[LaRa] Shutting down…")
+        shutdown_logging()
+        os._exit(0)
     if _shutdown_requested:
-        return
+        shutdown_logging()
+        os._exit(1)   # Second Ctrl+C: force quit without cleanup
     _shutdown_requested = True
-    print("\n[LaRa] Shutting down…")
-    os._exit(0)   # bypass Python atexit/threading cleanup — no spurious traceback
+    _shutdown_event.set()
 
 signal.signal(signal.SIGINT,  _handle_signal)
 signal.signal(signal.SIGTERM, _handle_signal)
@@ -268,6 +279,28 @@ def _stop_pipeline():
     _current_session = None
 
 
+def _graceful_shutdown(timeout_s: float = 5.0):
+    """Stop speech and any active session, then flush buffered metrics before exit."""
+    try:
+        from src.tts.kokoro_TTS import TTSService
+        if TTSService._instance is not None and TTSService._instance.model is not None:
+            TTSService._instance.model.stop_speaking()
+    except Exception:
+        pass
+
+    if _session_active:
+        _stop_pipeline()
+        target = next((t for t in threading.enumerate() if t.name == "lara-pipeline"), None)
+        if target is not None:
+            target.join(timeout_s)   # Lets the session's finally-block flush and report
+
+    try:
+        from src.core.metrics import flush as flush_metrics
+        flush_metrics()
+    except Exception:
+        pass
+
+
 if __name__ == "__main__":
     print("\n\033[96m============================================================\033[0m")
     print("\033[96m        LaRa — Low-Cost Adaptive Robotic-AI Assistant\033[0m")
@@ -283,7 +316,10 @@ if __name__ == "__main__":
     try:
         from src.system.bootstrap import initialize as initialize_system
     except ImportError as e:
-        print(f"[LaRa] FATAL: bootstrap import failed — {e}"); os._exit(1)
+        print(f"[LaRa] FATAL: bootstrap import failed — {e}")
+        logging.critical(f"[System Boot] Bootstrap import failed: {e}", exc_info=True)
+        shutdown_logging()
+        os._exit(1)
 
     print("\033[93m[System Boot]\033[0m Initializing neural services (STT, TTS, LLM)…")
     try:
@@ -292,6 +328,7 @@ if __name__ == "__main__":
     except Exception as e:
         print(f"[LaRa] FATAL: Initialization failed — {e}")
         logging.critical(f"[System Boot] Fatal: {e}", exc_info=True)
+        shutdown_logging()   # os._exit skips atexit: drain the log queue first
         os._exit(1)
 
     try:
@@ -306,9 +343,23 @@ if __name__ == "__main__":
 
     print("\n\033[92m[LaRa] Ready. Open the dashboard and click 'Start Session'.\033[0m\n")
 
-    try:
-        while True:
-            time.sleep(1)
-    except KeyboardInterrupt:
-        print("\n[LaRa] Goodbye.")
-        os._exit(0)
+    # Signals write a byte to this pipe, so the idle wait below returns at once
+    _wakeup_r = None
+    if os.name == "posix":
+        _wakeup_r, _wakeup_w = os.pipe()
+        os.set_blocking(_wakeup_r, False)
+        os.set_blocking(_wakeup_w, False)
+        signal.set_wakeup_fd(_wakeup_w)
+
+    _wait_loop_running = True
+    while not _shutdown_event.is_set():
+        if _wakeup_r is not None:
+            if select.select([_wakeup_r], [], [], 1.0)[0]:
+                os.read(_wakeup_r, 512)
+        else:
+            _shutdown_event.wait(1.0)
+
+    print("\n[LaRa] Shutting down…")
+    _graceful_shutdown()
+    print("[LaRa] Goodbye.")
+    sys.exit(0)   # Normal exit: atexit flushes the log queue and metrics ring
@@ -20,7 +20,9 @@ Rules (from system_invariants.md):
 """
 
 import re
+import math
 import time
+import heapq
 import logging
 from dataclasses import dataclass
 from typing import Optional
@@ -29,6 +31,9 @@ from typing import Optional
 MAX_PREFERENCES_PER_USER = 20
 MAX_TOPIC_LENGTH = 50
 
+# A preference stays in LLM context while 0.97 ** days_old > 0.3
+_ACTIVE_WINDOW_S = math.log(0.3) / math.log(0.97) * 86400
+
 
 @dataclass
 class Preference:
@@ -39,36 +44,44 @@ class Preference:
 
 
 # --- Regex Patterns for Preference Detection ---
+# Compiled once at import; extract_preferences runs on every utterance.
 # Positive patterns (likes)
-LIKE_PATTERNS = [
+LIKE_PATTERNS = [re.compile(p) for p in [
     r"\bi (?:really )?(?:like|love|enjoy|want)(?: to)? (.+?)(?:\.|!|$)",
     r"\bmy (?:favorite|favourite) (?:\w+ )?is (.+?)(?:\.|!|$)",
     r"\bi (?:really )?(?:like|love|enjoy) (.+?)(?:\.|!|$)",
     r"\b(.+?) (?:is|are) (?:my )?(?:favorite|favourite|the best)(?:\.|!|$)",
     r"\bi think (.+?) (?:is|are) (?:cool|fun|great|awesome|amazing|nice)(?:\.|!|$)",
-]
+]]
 
 # Negative patterns (dislikes)
-DISLIKE_PATTERNS = [
+DISLIKE_PATTERNS = [re.compile(p) for p in [
     r"\bi (?:don'?t|do not) (?:really )?(?:like|want|enjoy) (.+?)(?:\.|!|$)",
     r"\bi (?:hate|dislike) (.+?)(?:\.|!|$)",
     r"\b(.+?) (?:is|are) (?:scary|boring|yucky|bad|mean|stupid|gross)(?:\.|!|$)",
     r"\bi(?:'m| am) (?:scared|afraid) of (.+?)(?:\.|!|$)",
     r"\bi (?:don'?t|do not) want (.+?)(?:\.|!|$)",
-]
+]]
+
+
+_FILLERS = ("a ", "an ", "the ", "some ", "to ", "that ", "this ", "it ", "when ")
+_NOISE_TOPICS = frozenset(("it", "that", "this", "them", "those", "something", "anything", "everything"))
 
 
 def _clean_topic(raw: str) -> Optional[str]:
     """Clean and validate an extracted topic string."""
     topic = raw.strip().lower()
     # Remove common filler words at the start
-    topic = re.sub(r"^(a |an |the |some |to |that |this |it |when )", "", topic)
+    for filler in _FILLERS:
+        if topic.startswith(filler):
+            topic = topic[len(filler):]
+            break
     topic = topic.strip()
     
     # Reject if too short, too long, or just noise
     if len(topic) < 2 or len(topic) > MAX_TOPIC_LENGTH:
         return None
-    if topic in ("it", "that", "this", "them", "those", "something", "anything", "everything"):
+    if topic in _NOISE_TOPICS:
         return None
     
     return topic
@@ -86,18 +99,22 @@ def extract_preferences(text: str) -> list[Preference]:
     results = []
     now = time.time()
     
-    # Check dislike patterns first (they're more specific with "don't like")
+    # Check dislike patterns first (they're more specific with "don't like").
+    # One search per pattern: their matches can overlap, so a single
+    # alternation scan would drop topics (e.g. a "hate" after a "don't like").
+    seen = set()
     for pattern in DISLIKE_PATTERNS:
-        match = re.search(pattern, text_lower)
+        match = pattern.search(text_lower)
         if match:
             topic = _clean_topic(match.group(1))
-            if topic:
+            if topic and topic not in seen:
+                seen.add(topic)
                 results.append(Preference(topic=topic, sentiment="dislike", timestamp=now))
     
     # Check like patterns (skip if we already found a dislike for same text)
     if not results:
         for pattern in LIKE_PATTERNS:
-            match = re.search(pattern, text_lower)
+            match = pattern.search(text_lower)
             if match:
                 topic = _clean_topic(match.group(1))
                 if topic:
@@ -105,7 +122,7 @@ def extract_preferences(text: str) -> list[Preference]:
                     break  # One like per utterance is enough
     
     for p in results:
-        logging.info(f"[Preference] Detected: {p.sentiment} → {p.topic}")
+        logging.info("[Preference] Detected: %s → %s", p.sentiment, p.topic)
     
     return results
 
@@ -117,6 +134,14 @@ class ChildPreferenceManager:
     Detects, stores, deduplicates, and provides preferences
     for LLM context injection.
     """
+
+    # Constant SQL strings so sqlite3's per-connection statement cache is hit
+    _UPDATE_SQL = "UPDATE child_preferences SET sentiment = ?, timestamp = ? WHERE user_id = ? AND topic = ?"
+    _DELETE_SQL = "DELETE FROM child_preferences WHERE user_id = ? AND topic = ?"
+    _INSERT_SQL = (
+        "INSERT OR REPLACE INTO child_preferences (user_id, topic, sentiment, timestamp) "
+        "VALUES (?, ?, ?, ?)"
+    )
     
     def __init__(self, memory_manager):
         """
@@ -125,7 +150,13 @@ class ChildPreferenceManager:
         """
         self._memory = memory_manager
         self._user_id = None
-        self._cached_preferences: list[Preference] = []
+        self._cached_preferences: dict[str, Preference] = {}
+        # (timestamp, topic) min-heap for oldest-first eviction; entries whose
+        # timestamp no longer matches the cache are stale and skipped lazily.
+        self._pref_heap: list[tuple[float, str]] = []
+        # Memoized get_context_for_llm(): bumped on every cache change
+        self._context_version = 0
+        self._context_cache: tuple[int, float, str] = (-1, 0.0, "")  # (version, valid_until, text)
         self._ensure_table()
         logging.info("[Preference] Manager initialized.")
     
@@ -151,7 +182,9 @@ class ChildPreferenceManager:
     
     def _load_preferences(self):
         """Load preferences from SQLite into memory cache."""
-        self._cached_preferences = []
+        self._cached_preferences = {}
+        self._pref_heap = []
+        self._context_version += 1
         if not self._memory or not self._user_id:
             return
         
@@ -162,15 +195,17 @@ class ChildPreferenceManager:
             ).fetchall()
             
             for r in rows:
-                self._cached_preferences.append(Preference(
+                self._cached_preferences[r["topic"]] = Preference(
                     topic=r["topic"],
                     sentiment=r["sentiment"],
                     timestamp=r["timestamp"]
-                ))
+                )
+            self._pref_heap = [(p.timestamp, t) for t, p in self._cached_preferences.items()]
+            heapq.heapify(self._pref_heap)
             
             if self._cached_preferences:
                 logging.info(
-                    f"[Preference] Loaded {len(self._cached_preferences)} preferences for {self._user_id}"
+                    "[Preference] Loaded %d preferences for %s", len(self._cached_preferences), self._user_id
                 )
         except Exception as e:
             logging.warning(f"[Preference] Failed to load: {e}")
@@ -193,46 +228,47 @@ class ChildPreferenceManager:
         if not self._memory or not self._user_id:
             return
         
-        # Check if we already have this topic
-        existing_topics = {p.topic for p in self._cached_preferences}
-        
-        if pref.topic in existing_topics:
-            # Update sentiment if it changed (e.g., "I like X" → "I don't like X")
-            self._memory._conn.execute("""
-                UPDATE child_preferences SET sentiment = ?, timestamp = ?
-                WHERE user_id = ? AND topic = ?
-            """, (pref.sentiment, pref.timestamp, self._user_id, pref.topic))
-            self._memory._conn.commit()
+        conn = self._memory._conn
+        # `with conn` commits the update (or evict + insert) as one transaction
+        with self._memory._lock, conn:
+            # Check if we already have this topic
+            existing = self._cached_preferences.get(pref.topic)
             
-            # Update cache
-            for p in self._cached_preferences:
-                if p.topic == pref.topic:
-                    p.sentiment = pref.sentiment
-                    p.timestamp = pref.timestamp
+            if existing is not None:
+                # Update sentiment if it changed (e.g., "I like X" → "I don't like X")
+                conn.execute(self._UPDATE_SQL, (pref.sentiment, pref.timestamp, self._user_id, pref.topic))
+                
+                # Update cache
+                existing.sentiment = pref.sentiment
+                existing.timestamp = pref.timestamp
+                heapq.heappush(self._pref_heap, (pref.timestamp, pref.topic))
+                self._context_version += 1
+                
+                logging.info("[Preference] Updated: %s → %s", pref.topic, pref.sentiment)
+                return
             
-            logging.info(f"[Preference] Updated: {pref.topic} → {pref.sentiment}")
-            return
-        
-        # Enforce max preferences limit
-        if len(self._cached_preferences) >= MAX_PREFERENCES_PER_USER:
-            # Remove oldest preference
-            oldest = min(self._cached_preferences, key=lambda p: p.timestamp)
-            self._memory._conn.execute(
-                "DELETE FROM child_preferences WHERE user_id = ? AND topic = ?",
-                (self._user_id, oldest.topic)
-            )
-            self._cached_preferences.remove(oldest)
-            logging.info(f"[Preference] Evicted oldest: {oldest.topic}")
-        
-        # Insert new
-        self._memory._conn.execute("""
-            INSERT OR REPLACE INTO child_preferences (user_id, topic, sentiment, timestamp)
-            VALUES (?, ?, ?, ?)
-        """, (self._user_id, pref.topic, pref.sentiment, pref.timestamp))
-        self._memory._conn.commit()
-        self._cached_preferences.append(pref)
+            # Enforce max preferences limit
+            if len(self._cached_preferences) >= MAX_PREFERENCES_PER_USER:
+                # Remove oldest preference
+                oldest = self._pop_oldest()
+                conn.execute(self._DELETE_SQL, (self._user_id, oldest.topic))
+                logging.info("[Preference] Evicted oldest: %s", oldest.topic)
+            
+            # Insert new
+            conn.execute(self._INSERT_SQL, (self._user_id, pref.topic, pref.sentiment, pref.timestamp))
+            self._cached_preferences[pref.topic] = pref
+            heapq.heappush(self._pref_heap, (pref.timestamp, pref.topic))
+            self._context_version += 1
         
-        logging.info(f"[Preference] Stored: {pref.sentiment} → {pref.topic}")
+        logging.info("[Preference] Stored: %s → %s", pref.sentiment, pref.topic)
+    
+    def _pop_oldest(self) -> Preference:
+        """Remove and return the oldest cached preference, skipping stale heap entries."""
+        while True:
+            ts, topic = heapq.heappop(self._pref_heap)
+            p = self._cached_preferences.get(topic)
+            if p is not None and p.timestamp == ts:
+                return self._cached_preferences.pop(topic)
     
     def get_context_for_llm(self) -> str:
         """
@@ -248,34 +284,36 @@ class ChildPreferenceManager:
             return ""
             
         now = time.time()
-        active_prefs = []
-        for p in self._cached_preferences:
-            days_old = (now - p.timestamp) / 86400
-            current_weight = 0.97 ** days_old
-            if current_weight > 0.3:
-                active_prefs.append(p)
+        version, valid_until, cached = self._context_cache
+        if version == self._context_version and now < valid_until:
+            return cached
         
-        likes = [p.topic for p in active_prefs if p.sentiment == "like"]
-        dislikes = [p.topic for p in active_prefs if p.sentiment == "dislike"]
+        # Preferences decay out of context over time, so the cached text is
+        # only valid until the next active preference ages past the window.
+        active_prefs = [p for p in self._cached_preferences.values() if now - p.timestamp < _ACTIVE_WINDOW_S]
+        valid_until = min((p.timestamp + _ACTIVE_WINDOW_S for p in active_prefs), default=math.inf)
+        
+        likes = ", ".join(p.topic for p in active_prefs if p.sentiment == "like")
+        dislikes = ", ".join(p.topic for p in active_prefs if p.sentiment == "dislike")
         
         parts = []
         if likes:
-            parts.append(f"Likes: {', '.join(likes)}")
+            parts.append(f"Likes: {likes}")
         if dislikes:
-            parts.append(f"Dislikes: {', '.join(dislikes)}")
-        
-        if not parts:
-            return ""
+            parts.append(f"Dislikes: {dislikes}")
         
-        context = (
-            "[User's preferences — weave these into your responses naturally. "
-            "Do NOT list them or say 'I know you like X'. "
-            "Instead, use them to choose examples, topics, and references.\n"
-            f"{'; '.join(parts)}]"
-        )
+        context = ""
+        if parts:
+            context = (
+                "[User's preferences — weave these into your responses naturally. "
+                "Do NOT list them or say 'I know you like X'. "
+                "Instead, use them to choose examples, topics, and references.\n"
+                f"{'; '.join(parts)}]"
+            )
         
+        self._context_cache = (self._context_version, valid_until, context)
         return context
     
     def get_all_preferences(self) -> list[Preference]:
         """Return all cached preferences."""
-        return list(self._cached_preferences)
+        return list(self._cached_preferences.values())
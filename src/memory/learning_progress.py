@@ -35,11 +35,14 @@ class LearningProgressManager:
         """
         self._memory = memory_manager
         self._user_id = None
+        # concept -> mastery for the active user; refreshed by update_attempt
+        self._mastery_cache: dict[str, int] = {}
         logging.info("[LearningProgress] Manager initialized.")
     
     def set_user(self, user_id: str):
         """Set the active user for this session."""
         self._user_id = user_id
+        self._mastery_cache.clear()
     
     def update_attempt(self, concept: str, difficulty: int, success: bool):
         """
@@ -54,11 +57,11 @@ class LearningProgressManager:
             return
         
         progress = self._memory.record_attempt(self._user_id, concept, success)
+        self._mastery_cache[concept] = progress.mastery_level
         
         logging.info(
-            f"[LearningProgress] {concept} | difficulty={difficulty} | "
-            f"success={success} | mastery={progress.mastery_level}/5 | "
-            f"attempts={progress.attempt_count}"
+            "[LearningProgress] %s | difficulty=%s | success=%s | mastery=%d/5 | attempts=%d",
+            concept, difficulty, success, progress.mastery_level, progress.attempt_count,
         )
         
         return progress
@@ -68,8 +71,11 @@ class LearningProgressManager:
         if not self._memory or not self._user_id:
             return 0
         
-        progress = self._memory.get_learning_progress(self._user_id, concept)
-        return progress.mastery_level
+        mastery = self._mastery_cache.get(concept)
+        if mastery is None:
+            mastery = self._memory.get_learning_progress(self._user_id, concept).mastery_level
+            self._mastery_cache[concept] = mastery
+        return mastery
     
     def get_baseline_difficulty(self, concept: str) -> int:
         """
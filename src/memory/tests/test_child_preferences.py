@@ -0,0 +1,106 @@
+"""
+Tests for ChildPreferenceManager: heap-based oldest-first eviction, the
+memoized LLM context, and per-write commits (SQLite in a temp directory).
+"""
+import sys
+import os
+import sqlite3
+import tempfile
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+os.environ.setdefault("LARA_DATA_DIR", tempfile.mkdtemp(prefix="lara-test-"))
+
+import pytest
+
+from src.memory import child_preferences as cp
+from src.memory.child_preferences import ChildPreferenceManager, Preference
+from src.memory.user_memory import UserMemoryManager
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "prefs.db")
+
+
+@pytest.fixture
+def prefs(db_path):
+    manager = ChildPreferenceManager(UserMemoryManager(db_path))
+    manager.set_user("amy")
+    yield manager
+    manager._memory._conn.close()
+
+
+def _pref(topic, sentiment="like", age_s=0.0):
+    return Preference(topic=topic, sentiment=sentiment, timestamp=time.time() - age_s)
+
+
+def _stored_topics(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return {row[0] for row in conn.execute("SELECT topic FROM child_preferences WHERE user_id = 'amy'")}
+    finally:
+        conn.close()
+
+
+# ── Eviction ─────────────────────────────────────────────────
+
+def test_full_cache_evicts_oldest(prefs, db_path):
+    for i in range(cp.MAX_PREFERENCES_PER_USER):
+        prefs._store_preference(_pref(f"topic{i}", age_s=1000 - i))
+    prefs._store_preference(_pref("newest"))
+
+    topics = {p.topic for p in prefs.get_all_preferences()}
+    assert len(topics) == cp.MAX_PREFERENCES_PER_USER
+    assert "topic0" not in topics and "newest" in topics
+    assert _stored_topics(db_path) == topics
+
+
+def test_updated_preference_is_no_longer_oldest(prefs):
+    for i in range(cp.MAX_PREFERENCES_PER_USER):
+        prefs._store_preference(_pref(f"topic{i}", age_s=1000 - i))
+    # Refreshing topic0 leaves a stale heap entry behind; eviction must skip it
+    prefs._store_preference(_pref("topic0", sentiment="dislike"))
+    prefs._store_preference(_pref("newest"))
+
+    topics = {p.topic for p in prefs.get_all_preferences()}
+    assert "topic0" in topics
+    assert "topic1" not in topics
+
+
+def test_reload_rebuilds_heap_from_db(prefs, db_path):
+    for i in range(cp.MAX_PREFERENCES_PER_USER):
+        prefs._store_preference(_pref(f"topic{i}", age_s=1000 - i))
+    prefs.set_user("amy")   # Reload from SQLite
+    prefs._store_preference(_pref("newest"))
+    assert "topic0" not in {p.topic for p in prefs.get_all_preferences()}
+
+
+# ── Persistence ──────────────────────────────────────────────
+
+def test_writes_are_committed_immediately(prefs, db_path):
+    prefs.process_utterance("I really love dinosaurs")
+    assert not prefs._memory._conn.in_transaction
+    assert _stored_topics(db_path) == {"dinosaurs"}
+
+
+# ── Context cache ────────────────────────────────────────────
+
+def test_context_is_memoized_until_preferences_change(prefs):
+    prefs._store_preference(_pref("dinosaurs"))
+    first = prefs.get_context_for_llm()
+    assert "Likes: dinosaurs" in first
+    assert prefs.get_context_for_llm() is first
+
+    prefs._store_preference(_pref("spiders", sentiment="dislike"))
+    second = prefs.get_context_for_llm()
+    assert second is not first
+    assert "Dislikes: spiders" in second
+
+
+def test_context_expires_when_a_preference_ages_out(prefs, monkeypatch):
+    prefs._store_preference(_pref("dinosaurs", age_s=cp._ACTIVE_WINDOW_S - 60))
+    assert "dinosaurs" in prefs.get_context_for_llm()
+
+    later = time.time() + 120
+    monkeypatch.setattr(cp.time, "time", lambda: later)
+    assert prefs.get_context_for_llm() == ""
@@ -0,0 +1,137 @@
+"""
+Tests for VectorMemory query planning and the retrieve_relevant cache
+(no ChromaDB: a fake collection records every query it receives).
+"""
+import sys
+import os
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+import pytest
+
+from src.memory import vector_memory as vm
+
+
+class FakeCollection:
+    """Minimal Chroma collection: rows are (summary, metadata), returned in insertion order."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    def query(self, query_embeddings, include, n_results, where=None):
+        self.queries.append({"n_results": n_results, "where": where})
+        rows = self.rows
+        if where is not None:
+            user = where["$and"][0]["user_id"]["$eq"]
+            cutoff = where["$and"][1]["timestamp"]["$gte"]
+            rows = [r for r in rows if r[1]["user_id"] == user and r[1]["timestamp"] >= cutoff]
+        rows = rows[:n_results]
+        return {
+            "documents": [[r[0] for r in rows]],
+            "metadatas": [[r[1] for r in rows]],
+            "distances": [[0.1] * len(rows)],
+        }
+
+    def get(self, **kwargs):
+        return {"ids": []}
+
+    def delete(self, ids):
+        pass
+
+
+def _row(user, i, age_days=0.0):
+    ts = time.time() - age_days * 86400
+    return (f"story {user} {i}", {"user_id": user, "concept": "animals", "timestamp": ts})
+
+
+def _memory(rows, user, user_counts):
+    mem = vm.VectorMemory(embedder=lambda texts: [[0.0, 0.0, 0.0] for _ in texts])
+    mem._enabled = True
+    mem._collection = FakeCollection(rows)
+    mem._doc_count = len(rows)
+    mem._user_doc_count = dict(user_counts)
+    mem.set_user(user)
+    return mem
+
+
+# ── Selectivity plan ─────────────────────────────────────────
+
+def test_dominant_user_uses_oversampled_unfiltered_query():
+    rows = [_row("amy", i) for i in range(6)] + [_row("ben", i) for i in range(2)]
+    mem = _memory(rows, "amy", {"amy": 6, "ben": 2})
+    mem.retrieve_relevant("a story", n=2)
+    (q,) = mem._collection.queries
+    assert q["where"] is None
+    assert q["n_results"] == 3   # ceil(2 * 8 / 6)
+
+
+def test_rare_user_uses_where_clause():
+    rows = [_row("amy", i) for i in range(9)] + [_row("ben", 0)]
+    mem = _memory(rows, "ben", {"amy": 9, "ben": 1})
+    memories = mem.retrieve_relevant("a story", n=2)
+    (q,) = mem._collection.queries
+    assert q["where"] is not None
+    assert q["n_results"] == 1   # Capped at the user's own story count
+    assert [m.summary for m in memories] == ["story ben 0"]
+
+
+def test_unfiltered_plan_drops_other_users_and_expired_stories():
+    rows = [_row("amy", 1), _row("amy", 0, age_days=vm.STORY_EXPIRY_DAYS + 1), _row("ben", 0),
+            _row("amy", 2), _row("amy", 3)]
+    mem = _memory(rows, "amy", {"amy": 4, "ben": 1})
+    memories = mem.retrieve_relevant("a story", n=2)
+    assert mem._collection.queries[0] == {"n_results": 3, "where": None}
+    assert [m.summary for m in memories] == ["story amy 1"]
+
+
+def test_user_without_stories_skips_query():
+    mem = _memory([_row("amy", 0)], "ben", {"amy": 1, "ben": 0})
+    assert mem.retrieve_relevant("a story") == []
+    assert mem._collection.queries == []
+
+
+# ── Query cache ──────────────────────────────────────────────
+
+@pytest.fixture
+def cached_mem():
+    rows = [_row("amy", i) for i in range(3)]
+    return _memory(rows, "amy", {"amy": 3})
+
+
+def test_repeated_query_is_served_from_cache(cached_mem):
+    first = cached_mem.retrieve_relevant("Tell me a story ")
+    second = cached_mem.retrieve_relevant("tell me a story")
+    assert len(cached_mem._collection.queries) == 1
+    assert [m.summary for m in first] == [m.summary for m in second]
+    assert first[0] is not second[0]   # Callers get copies they can re-rank
+
+
+def test_cache_entries_expire(cached_mem, monkeypatch):
+    cached_mem.retrieve_relevant("tell me a story")
+    later = time.monotonic() + vm.QUERY_CACHE_TTL_S + 1
+    monkeypatch.setattr(vm.time, "monotonic", lambda: later)
+    cached_mem.retrieve_relevant("tell me a story")
+    assert len(cached_mem._collection.queries) == 2
+
+
+def test_set_user_and_writes_invalidate_cache(cached_mem):
+    cached_mem.retrieve_relevant("tell me a story")
+    cached_mem.set_user("amy")
+    cached_mem.retrieve_relevant("tell me a story")
+    cached_mem._invalidate_query_cache()   # What the batch writer does after an add
+    cached_mem.retrieve_relevant("tell me a story")
+    assert len(cached_mem._collection.queries) == 3
+
+
+def test_cached_result_hides_summaries_injected_since(cached_mem):
+    cached_mem.retrieve_relevant("tell me a story")
+    cached_mem._injected_summaries.add("story amy 0")
+    assert cached_mem.retrieve_relevant("tell me a story") == []
+    assert len(cached_mem._collection.queries) == 1
+
+
+def test_cache_size_is_bounded(cached_mem):
+    for i in range(vm.QUERY_CACHE_MAX_ENTRIES + 5):
+        cached_mem.retrieve_relevant(f"story number {i}")
+    assert len(cached_mem._query_cache) == vm.QUERY_CACHE_MAX_ENTRIES
@@ -37,6 +37,9 @@ DB_PATH = os.path.join(get_sessions_dir(), _db_file)
 METRIC_DECAY_FACTOR    = _DECAY_FACTOR
 DECAY_INTERVAL_SECONDS = 24 * 60 * 60  # 24 hours
 
+# UPSERT ... RETURNING lets record_attempt read-modify-write in one statement
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
 
 @dataclass
 class UserProfile:
@@ -96,6 +99,10 @@ class UserMemoryManager:
             check_same_thread=False
         )
         self._conn.row_factory = sqlite3.Row
+        # WAL + NORMAL: commits append to the WAL without a rollback-journal fsync
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
         
         self._conn.executescript("""
             CREATE TABLE IF NOT EXISTS user_profiles (
@@ -211,6 +218,9 @@ class UserMemoryManager:
         On success: increment mastery (max 5), update highest level.
         Always: increment attempt count.
         """
+        if _HAS_RETURNING:
+            return self._record_attempt_returning(user_id, concept_name, success)
+        
         progress = self.get_learning_progress(user_id, concept_name)
         progress.attempt_count += 1
         
@@ -235,10 +245,52 @@ class UserMemoryManager:
             self._conn.commit()
         
         logging.info(
-            f"[UserMemory] Learning: {concept_name} | "
-            f"Mastery: {progress.mastery_level}/5 | "
-            f"Attempts: {progress.attempt_count} | "
-            f"Success: {success}"
+            "[UserMemory] Learning: %s | Mastery: %d/5 | Attempts: %d | Success: %s",
+            concept_name, progress.mastery_level, progress.attempt_count, success,
+        )
+        return progress
+    
+    def _record_attempt_returning(self, user_id: str, concept_name: str, success: bool):
+        """record_attempt as a single UPSERT ... RETURNING round-trip and commit."""
+        params = {
+            "user_id": user_id,
+            "concept_name": concept_name,
+            "success": 1 if success else 0,
+            "now": time.time() if success else 0.0,
+        }
+        with self._lock:
+            # SET expressions see the pre-update row, so mastery_level + 1 is the old value + 1
+            row = self._conn.execute("""
+                INSERT INTO learning_progress (
+                    user_id, concept_name, mastery_level, highest_success_level,
+                    attempt_count, last_success_timestamp
+                )
+                VALUES (:user_id, :concept_name, :success, :success, 1, :now)
+                ON CONFLICT(user_id, concept_name) DO UPDATE SET
+                    attempt_count = attempt_count + 1,
+                    mastery_level = CASE WHEN :success
+                        THEN MIN(5, mastery_level + 1) ELSE mastery_level END,
+                    highest_success_level = CASE WHEN :success
+                        THEN MAX(highest_success_level, MIN(5, mastery_level + 1))
+                        ELSE highest_success_level END,
+                    last_success_timestamp = CASE WHEN :success
+                        THEN :now ELSE last_success_timestamp END
+                RETURNING mastery_level, highest_success_level,
+                          attempt_count, last_success_timestamp
+            """, params).fetchone()
+            self._conn.commit()
+        
+        progress = LearningProgress(
+            user_id=user_id,
+            concept_name=concept_name,
+            mastery_level=row["mastery_level"],
+            highest_success_level=row["highest_success_level"],
+            attempt_count=row["attempt_count"],
+            last_success_timestamp=row["last_success_timestamp"]
+        )
+        logging.info(
+            "[UserMemory] Learning: %s | Mastery: %d/5 | Attempts: %d | Success: %s",
+            concept_name, progress.mastery_level, progress.attempt_count, success,
         )
         return progress
     
@@ -13,20 +13,22 @@ Rules:
 - Summaries must pass length validation before storage
 """
 
+import functools
+import importlib.util
 import logging
+import math
 import os
+import re
 import time
 import threading
 import queue
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from typing import Optional
 
-try:
-    import chromadb
-    from chromadb.config import Settings
-    CHROMADB_AVAILABLE = True
-except ImportError:
-    CHROMADB_AVAILABLE = False
+# ChromaDB (and its onnxruntime/embedding stack) is only imported when a
+# VectorMemory is created, not when the pipeline imports this module at boot.
+CHROMADB_AVAILABLE = importlib.util.find_spec("chromadb") is not None
+if not CHROMADB_AVAILABLE:
     logging.warning("[VectorMemory] ChromaDB not installed. Vector memory disabled.")
 
 
@@ -53,6 +55,36 @@ except Exception:
     MAX_INJECTIONS = 2
     MIN_COMPOSITE_SCORE = 0.45
 
+# HNSW index config for the story collection: a small (<100K vectors),
+# latency-critical corpus. M/construction_ef favour recall at build time,
+# search_ef pins query cost, and one index thread avoids contention with the
+# STT/TTS threads. Past ~100K stories, M=64 / construction_ef=800 is the
+# recommended step up (requires recreating the collection).
+HNSW_METADATA = {
+    "hnsw:space": "cosine",
+    "hnsw:M": 32,
+    "hnsw:construction_ef": 200,
+    "hnsw:search_ef": 64,
+    "hnsw:num_threads": 1,
+}
+
+# Background writer batching: one collection.add per batch amortises the
+# HNSW insert and SQLite commit across summaries
+WRITE_BATCH_SIZE        = 64
+WRITE_FLUSH_INTERVAL_S  = 0.5
+CLEANUP_PAGE_SIZE       = 1000
+
+# Query plan: when the active user owns more than this share of the collection,
+# an unfiltered oversampled query + metadata post-filter beats Chroma's where-clause;
+# below it the filtered query avoids scanning other users' neighbours. The
+# oversample factor is 1/share, so this also caps it at 4x.
+POST_FILTER_MIN_SELECTIVITY = 0.25
+
+# Short-lived cache of retrieve_relevant results for repeated phrases
+# ("tell me a story" again) so repeats skip the embedding + HNSW query
+QUERY_CACHE_TTL_S       = 30.0
+QUERY_CACHE_MAX_ENTRIES = 64
+
 COLLECTION_NAME            = "lara_story_summaries"
 
 # Trigger phrases that indicate the child wants a story / recall
@@ -66,6 +98,8 @@ STORY_TRIGGERS = [
     "tell me about",
     "i want to hear about",
 ]
+# One alternation scanned in a single pass instead of a substring test per phrase
+_TRIGGER_RE = re.compile("|".join(map(re.escape, STORY_TRIGGERS)))
 
 
 @dataclass
@@ -83,11 +117,13 @@ class VectorMemory:
     Retrieved summaries are injected naturally into the LLM prompt.
     """
 
-    def __init__(self, persist_dir: str = None):
+    def __init__(self, persist_dir: str = None, embedder=None):
         """
         Args:
             persist_dir: Directory to persist ChromaDB data.
                          Defaults to $LARA_DATA_DIR/memory/lara_vector_store/
+            embedder: Chroma-style embedding function (list[str] -> vectors).
+                      Defaults to Chroma's bundled MiniLM embedder.
         """
         self._enabled = CHROMADB_AVAILABLE
         self._user_id: Optional[str] = None
@@ -95,6 +131,14 @@ class VectorMemory:
         self._injected_summaries = set()    # Anti-repetition tracker
         self._collection = None
         self._client = None
+        self._doc_count = 0                 # Cached collection.count(), kept in step with writes
+        self._user_doc_count: dict[str, int] = {}   # Per-user share of _doc_count (query planning)
+        self._lock = threading.Lock()       # Guards the two counts: writer thread vs set_user/cleanup
+        self._query_cache: dict[tuple, tuple] = {}  # (user, query, n) -> (expiry_ts, memories)
+        self._query_cache_lock = threading.Lock()   # Writer thread invalidates while turns read
+        self._embedder = embedder
+        # Query embeddings are cached so repeated intents skip the encoder pass
+        self._embed = functools.lru_cache(maxsize=256)(self._embed_uncached)
 
         if not self._enabled:
             return
@@ -106,17 +150,40 @@ class VectorMemory:
         os.makedirs(persist_dir, exist_ok=True)
 
         try:
+            import chromadb
+            from chromadb.config import Settings
+            if self._embedder is None:
+                from chromadb.utils import embedding_functions
+                self._embedder = embedding_functions.DefaultEmbeddingFunction()
             self._client = chromadb.PersistentClient(
                 path=persist_dir,
                 settings=Settings(anonymized_telemetry=False)
             )
-            self._collection = self._client.get_or_create_collection(
-                name=COLLECTION_NAME,
-                metadata={"hnsw:space": "cosine"}
-            )
+            # HNSW params are fixed when the collection is created; an existing
+            # store keeps whatever it was built with (recreate it to migrate)
+            try:
+                self._collection = self._client.get_collection(
+                    name=COLLECTION_NAME,
+                    embedding_function=self._embedder,
+                )
+            except Exception:   # Not-found error type differs across chromadb versions
+                self._collection = self._client.create_collection(
+                    name=COLLECTION_NAME,
+                    embedding_function=self._embedder,
+                    metadata=HNSW_METADATA
+                )
+            else:
+                existing = self._collection.metadata or {}
+                differing = sorted(k for k, v in HNSW_METADATA.items() if existing.get(k) != v)
+                if differing:
+                    logging.info(
+                        f"[VectorMemory] Existing collection keeps its index settings; "
+                        f"{', '.join(differing)} differ from HNSW_METADATA (recreate the store to apply them)"
+                    )
+            self._doc_count = self._collection.count()
             logging.info(
                 f"[VectorMemory] ChromaDB ready at {persist_dir}. "
-                f"Documents: {self._collection.count()}"
+                f"Documents: {self._doc_count}"
             )
         except Exception as e:
             logging.error(f"[VectorMemory] Failed to initialize ChromaDB: {e}")
@@ -129,30 +196,99 @@ class VectorMemory:
             self._worker_thread.start()
 
     def _embedding_worker(self):
-        """Background daemon processing ChromaDB writes avoiding main thread stutter."""
-        while True:
-            try:
-                task = self._write_queue.get()
+        """
+        Background daemon batching ChromaDB writes off the main thread.
+        Collects up to WRITE_BATCH_SIZE queued summaries (or whatever arrived
+        within WRITE_FLUSH_INTERVAL_S of the first one) into a single add().
+        """
+        stopping = False
+        while not stopping:
+            task = self._write_queue.get()
+            batch = []
+            deadline = time.monotonic() + WRITE_FLUSH_INTERVAL_S
+            while True:
                 if task is None:
+                    stopping = True
                     break
-                
-                doc_id, summary, metadata = task
-                self._collection.add(
-                    ids=[doc_id],
-                    documents=[summary],
-                    metadatas=[metadata]
-                )
-                logging.info(f"[VectorMemory] Async Stored: [{metadata['concept']}] {summary[:60]}")
-            except Exception as e:
-                logging.error(f"[VectorMemory] Async Store failed: {e}")
+                batch.append(task)
+                remaining = deadline - time.monotonic()
+                if len(batch) >= WRITE_BATCH_SIZE or remaining <= 0:
+                    break
+                try:
+                    task = self._write_queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+
+            try:
+                if batch:
+                    self._store_batch(batch)
             finally:
-                self._write_queue.task_done()
+                for _ in range(len(batch) + stopping):
+                    self._write_queue.task_done()
+
+    def _store_batch(self, batch):
+        """
+        Write one batch of (id, summary, metadata) tasks. Ids are second-resolution,
+        so a repeat within the batch keeps only the latest summary (Chroma rejects
+        the whole add on a duplicate id). If the batch add still fails, each item
+        is retried alone so one bad entry cannot drop the rest.
+        """
+        unique = list({doc_id: (doc_id, summary, meta) for doc_id, summary, meta in batch}.values())
+        try:
+            ids, summaries, metadatas = zip(*unique)
+            self._collection.add(ids=list(ids), documents=list(summaries), metadatas=list(metadatas))
+            stored = unique
+        except Exception as e:
+            logging.warning(f"[VectorMemory] Batch store failed ({len(unique)} summaries), retrying one by one: {e}")
+            stored = []
+            for doc_id, summary, meta in unique:
+                try:
+                    self._collection.add(ids=[doc_id], documents=[summary], metadatas=[meta])
+                    stored.append((doc_id, summary, meta))
+                except Exception as e:
+                    logging.error(f"[VectorMemory] Async Store failed for {doc_id}: {e}")
+        if not stored:
+            return
+
+        with self._lock:
+            self._doc_count += len(stored)
+            for _, _, meta in stored:
+                user = meta["user_id"]
+                if user in self._user_doc_count:
+                    self._user_doc_count[user] += 1
+        self._invalidate_query_cache()   # New stories must be visible to the next query
+        _, summary, meta = stored[-1]
+        logging.info(f"[VectorMemory] Async Stored {len(stored)} summaries: [{meta['concept']}] {summary[:60]}")
+
+    def flush(self):
+        """Block until every queued summary has been written. Call before shutdown."""
+        if self._enabled and self._worker_thread.is_alive():
+            self._write_queue.join()
+
+    def _invalidate_query_cache(self):
+        """Drop cached retrievals. Swaps in a new dict so a lookup that started
+        before the swap cannot store its now-stale result in the live cache."""
+        with self._query_cache_lock:
+            self._query_cache = {}
+
+    def _embed_uncached(self, query: str) -> list[float]:
+        """Embed a single (normalised) query string. Wrapped by self._embed."""
+        vec = self._embedder([query])[0]
+        return vec.tolist() if hasattr(vec, "tolist") else list(vec)
 
     def set_user(self, user_id: str):
         """Set active user and reset session retrieval counter."""
         self._user_id = user_id
         self._session_retrievals = 0
         self._injected_summaries = set()
+        self._invalidate_query_cache()
+        if self._enabled and user_id not in self._user_doc_count:
+            try:
+                owned = self._collection.get(where={"user_id": {"$eq": user_id}}, include=[])
+                with self._lock:
+                    self._user_doc_count[user_id] = len(owned.get("ids", []))
+            except Exception as e:
+                logging.warning(f"[VectorMemory] Could not count stories for {user_id}: {e}")
         logging.info(f"[VectorMemory] User set: {user_id}")
 
     def reset_session(self):
@@ -225,6 +361,35 @@ class VectorMemory:
         Returns:
             List of RetrievedMemory objects (may be empty).
         """
+        if self._session_retrievals >= MAX_RETRIEVALS_PER_SESSION:
+            logging.debug("[VectorMemory] Session retrieval cap reached.")
+            return []
+
+        key = (self._user_id, query.lower().strip(), n)
+        now = time.monotonic()
+        with self._query_cache_lock:
+            cache = self._query_cache
+            cached = cache.get(key)
+        if cached is not None and cached[0] > now:
+            memories = cached[1]
+        else:
+            memories = self._query_memories(query, n)
+            with self._query_cache_lock:
+                # Skip the store if a write or cleanup invalidated the cache meanwhile
+                if self._query_cache is cache:
+                    if len(cache) >= QUERY_CACHE_MAX_ENTRIES:
+                        cache = {k: v for k, v in cache.items() if v[0] > now}
+                        if len(cache) >= QUERY_CACHE_MAX_ENTRIES:
+                            del cache[next(iter(cache))]   # Oldest insert
+                        self._query_cache = cache
+                    cache[key] = (now + QUERY_CACHE_TTL_S, memories)
+
+        # Copies: ranking rewrites relevance in place, and summaries injected
+        # since the entry was cached must stay filtered out
+        return [replace(m) for m in memories if m.summary not in self._injected_summaries]
+
+    def _query_memories(self, query: str, n: int) -> list[RetrievedMemory]:
+        """Uncached Chroma lookup behind retrieve_relevant (same safety gates)."""
         if not self._enabled or not self._user_id:
             return []
 
@@ -232,34 +397,56 @@ class VectorMemory:
             logging.debug("[VectorMemory] Session retrieval cap reached.")
             return []
 
-        if self._collection.count() == 0:
+        # Cached count avoids a Chroma roundtrip per retrieval
+        doc_count = self._doc_count
+        if doc_count == 0:
             return []
 
-        # Expiry filter
-        cutoff_ts = time.time() - (STORY_EXPIRY_DAYS * 86400)
+        user_count = self._user_doc_count.get(self._user_id, doc_count)
+        if user_count == 0:
+            return []
 
-        try:
-            results = self._collection.query(
-                query_texts=[query],
-                n_results=min(n, self._collection.count()),
-                where={
+        # Expiry filter — one clock read shared with the days_ago computation
+        now = time.time()
+        cutoff_ts = now - (STORY_EXPIRY_DAYS * 86400)
+
+        if user_count / doc_count > POST_FILTER_MIN_SELECTIVITY:
+            # Oversample by 1/share so ~n of the neighbours are this user's;
+            # other users' and expired hits are dropped below
+            plan = {"n_results": min(math.ceil(n * doc_count / user_count), doc_count)}
+        else:
+            # Few of this user's stories among many: let Chroma pre-filter
+            plan = {
+                "n_results": min(n, user_count),
+                "where": {
                     "$and": [
                         {"user_id": {"$eq": self._user_id}},
                         {"timestamp": {"$gte": cutoff_ts}},
                     ]
                 },
-                include=["documents", "metadatas", "distances"]
+            }
+
+        try:
+            results = self._collection.query(
+                query_embeddings=[self._embed(query.lower().strip())],
+                include=["documents", "metadatas", "distances"],
+                **plan
             )
         except Exception as e:
             logging.error(f"[VectorMemory] Query failed: {e}")
             return []
 
         memories = []
-        docs  = results.get("documents",  [[]])[0]
-        metas = results.get("metadatas",  [[]])[0]
-        dists = results.get("distances",  [[]])[0]
+        hits = zip(
+            (results.get("documents") or [[]])[0],
+            (results.get("metadatas") or [[]])[0],
+            (results.get("distances") or [[]])[0],
+        )
+        for doc, meta, dist in hits:
+            # Post-filter for the unfiltered plan: other users' and expired stories
+            if meta.get("user_id") != self._user_id or meta.get("timestamp", 0) < cutoff_ts:
+                continue
 
-        for doc, meta, dist in zip(docs, metas, dists):
             # ChromaDB cosine distance: 0 = identical, 2 = opposite
             # Convert to similarity: 1 - dist/2
             similarity = 1.0 - (dist / 2.0)
@@ -270,6 +457,8 @@ class VectorMemory:
             if doc in self._injected_summaries:
                 continue
 
+            days_ago = (now - meta.get("timestamp", now)) / 86400
+
             # We store the raw cosine similarity as relevance here
             # Phase 5 ranking will composite this later
             memories.append(RetrievedMemory(
@@ -278,6 +467,8 @@ class VectorMemory:
                 relevance=round(similarity, 3),
                 days_ago=round(days_ago, 1),
             ))
+            if len(memories) == n:
+                break   # Oversampled plan: hits are distance-ordered
 
         return memories
 
@@ -343,12 +534,15 @@ class VectorMemory:
     # ══════════════════════════════════════════════════════════════════════════
 
     @staticmethod
-    def is_story_trigger(text: str) -> bool:
+    def is_story_trigger(text) -> bool:
         """
         Check if the user's utterance indicates they want a story or recall.
+        Accepts a str or an Utterance (reuses its lowercased text).
         """
-        text_lower = text.lower().strip()
-        return any(trigger in text_lower for trigger in STORY_TRIGGERS)
+        text_lower = getattr(text, "text_lower", None)
+        if text_lower is None:
+            text_lower = text.lower()
+        return _TRIGGER_RE.search(text_lower) is not None
 
     # ══════════════════════════════════════════════════════════════════════════
     # CLEANUP
@@ -360,20 +554,34 @@ class VectorMemory:
             return
 
         cutoff_ts = time.time() - (STORY_EXPIRY_DAYS * 86400)
+        removed = 0
         try:
-            # Get all IDs for this user older than cutoff
-            result = self._collection.get(
-                where={
-                    "$and": [
-                        {"user_id": {"$eq": self._user_id}},
-                        {"timestamp": {"$lt": cutoff_ts}},
-                    ]
-                },
-                include=["metadatas"]
-            )
-            ids = result.get("ids", [])
-            if ids:
+            # Page through expired IDs for this user (ids only, no payload);
+            # deleted rows drop out of the filter, so each page starts at 0
+            while True:
+                result = self._collection.get(
+                    where={
+                        "$and": [
+                            {"user_id": {"$eq": self._user_id}},
+                            {"timestamp": {"$lt": cutoff_ts}},
+                        ]
+                    },
+                    limit=CLEANUP_PAGE_SIZE,
+                    include=[]
+                )
+                ids = result.get("ids", [])
+                if not ids:
+                    break
                 self._collection.delete(ids=ids)
-                logging.info(f"[VectorMemory] Cleaned up {len(ids)} expired stories.")
+                removed += len(ids)
+                with self._lock:
+                    self._doc_count = max(0, self._doc_count - len(ids))
+                    if self._user_id in self._user_doc_count:
+                        self._user_doc_count[self._user_id] = max(0, self._user_doc_count[self._user_id] - len(ids))
+                if len(ids) < CLEANUP_PAGE_SIZE:
+                    break
         except Exception as e:
             logging.warning(f"[VectorMemory] Cleanup failed: {e}")
+        if removed:
+            self._invalidate_query_cache()   # Deleted stories must not be served from cache
+            logging.info(f"[VectorMemory] Cleaned up {removed} expired stories.")
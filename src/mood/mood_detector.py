@@ -10,9 +10,14 @@ Follows agents_instruction.txt constraints:
 """
 
 import logging
+import math
 import re
 import numpy as np
-from collections import deque
+
+try:
+    from src.perception.utterance import Utterance
+except ImportError:  # scripts that put src/ itself on sys.path
+    from perception.utterance import Utterance
 
 
 class Mood:
@@ -25,9 +30,14 @@ class Mood:
     QUIET = "quiet"
 
 
+# Dense integer codes for the moods, used by the smoothing window counters
+_MOODS = (Mood.NEUTRAL, Mood.HAPPY, Mood.SAD, Mood.FRUSTRATED, Mood.ANXIOUS, Mood.QUIET)
+_MOOD_INDEX = {mood: i for i, mood in enumerate(_MOODS)}
+
+
 # Keyword dictionaries for text-based mood detection
 MOOD_KEYWORDS = {
-    Mood.HAPPY: [
+    Mood.HAPPY: (
         # Core emotions
         "happy", "glad", "joy", "joyful", "cheerful", "excited", "wonderful",
         # Child expressions
@@ -45,8 +55,8 @@ MOOD_KEYWORDS = {
         "proud", "smart", "strong", "brave", "best", "enjoy",
         # Comfort
         "warm", "cozy", "safe", "home", "mama", "papa", "family", "satisfied", "content", "delighted",
-    ],
-    Mood.SAD: [
+    ),
+    Mood.SAD: (
         # Core emotions
         "sad", "unhappy", "upset", "cry", "crying", "tears", "sob",
         # Loss/longing
@@ -63,8 +73,8 @@ MOOD_KEYWORDS = {
         "give up", "don't care", "doesn't matter", "whatever", "wish", "why",
         # Pain
         "hurt", "hurting", "pain", "ow", "ouch", "sick", "tummy", "miserable",
-    ],
-    Mood.FRUSTRATED: [
+    ),
+    Mood.FRUSTRATED: (
         # Core emotions
         "angry", "mad", "furious", "annoyed", "annoying", "irritated",
         # Refusal
@@ -83,8 +93,8 @@ MOOD_KEYWORDS = {
         # Repetition frustration (multi-word only)
         "told you", "i said", "not again",
         "how many times",
-    ],
-    Mood.ANXIOUS: [
+    ),
+    Mood.ANXIOUS: (
         # Core emotions
         "scared", "afraid", "fear", "frightened", "terrified", "nervous",
         "worried", "worry", "anxious",
@@ -104,18 +114,35 @@ MOOD_KEYWORDS = {
         "don't leave", "hold", "come here", "where are you",
         # Panic
         "panic", "emergency", "hurry", "run", "hide", "shaking", "trembling", "scary",
-    ],
+    ),
 }
 
-# PRE-COMPILATION OF REGEX PATTERNS (HPC Optimization)
-# Compiles the raw string combinations into high-performance Regex matchers for fast iterations
-# instead of recompiling during every loop of _keyword_match_count
-PRECOMPILED_PATTERNS = {
-    mood: [re.compile(r'\b' + re.escape(kw) + r'\b') for kw in keywords]
-    for mood, keywords in MOOD_KEYWORDS.items()
+# Per-mood normalisation factor (1 / keyword count), fixed at import
+_NORM = {mood: 1.0 / len(keywords) for mood, keywords in MOOD_KEYWORDS.items() if keywords}
+
+# SINGLE-PASS KEYWORD INDEX
+# Every keyword starts and ends with a word character, so a \b-anchored match
+# can only begin at the start of a \w+ run whose text equals the keyword's
+# first run ("don" for "don't", "thank" for "thank you"). Indexing keywords by
+# that head word turns the ~80 per-keyword scans into one walk over the words
+# of the utterance with a dict lookup per word.
+_WORD_RUN_RE = re.compile(r"\w+")
+_WORD_CHAR_RE = re.compile(r"\w")
+_KEYWORD_INDEX: dict = {}
+for _mood, _keywords in MOOD_KEYWORDS.items():
+    for _kw in _keywords:
+        _head = _WORD_RUN_RE.match(_kw).group()
+        _entry = _KEYWORD_INDEX.setdefault(_head, {}).setdefault(_kw, [])
+        _entry.append(_mood)  # A keyword listed under several moods counts for each
+_KEYWORD_INDEX = {
+    head: tuple((kw, len(kw) == len(head), tuple(moods)) for kw, moods in entries.items())
+    for head, entries in _KEYWORD_INDEX.items()
 }
+del _mood, _keywords, _kw, _head, _entry
 
-# Audio prosody thresholds
+# Audio prosody thresholds (RMS on a [-1, 1] float scale; int16 PCM is
+# normalised by 32768² before comparison)
+_PCM16_FULL_SCALE_SQ = 32768.0 ** 2
 LOUD_RMS_THRESHOLD = 0.15      # Above this = high arousal (excited/upset)
 QUIET_RMS_THRESHOLD = 0.02     # Below this = withdrawn/quiet
 FAST_WORDS_PER_SEC = 3.0       # Faster = anxious
@@ -124,6 +151,18 @@ SHORT_UTTERANCE_WORDS = 3      # Very short = disengagement or frustration
 MAX_SPEAKING_RATE = 6.0        # Cap to prevent artificial spikes
 MIN_DURATION_FOR_RATE = 0.5    # Ignore speaking rate below this duration
 
+# Whole-utterance matches for short (<= SHORT_UTTERANCE_WORDS) replies
+_POSITIVE_SHORTS = frozenset({"yes", "yeah", "okay", "ok", "good", "sure", "yay", "hi", "hello", "cool", "nice"})
+_SHORT_FILLERS = frozenset({"um", "uh", "hmm", "well", "ah"})
+
+# Gate: every keyword/short reply starts with one of these characters, so a
+# transcript containing none of them (digits, symbols, non-Latin ASR junk)
+# cannot score and skips the keyword scan
+_SCORABLE_CHAR_RE = re.compile("[" + re.escape("".join(sorted(
+    {kw[0] for kws in MOOD_KEYWORDS.values() for kw in kws}
+    | {w[0] for w in _POSITIVE_SHORTS | _SHORT_FILLERS}
+))) + "]")
+
 NEGATION_WORDS = {
     "not", "don't", "dont", "never", "no", "won't", "wont",
     "can't", "cant", "isn't", "isnt", "aren't", "arent",
@@ -137,14 +176,9 @@ def _is_negated(text_lower: str, match_start: int) -> bool:
     Check if the keyword at match_start is preceded by a negation word
     within a 3-word window.
     """
-    # Look back at the text before the match
-    prefix = text_lower[:match_start].strip()
-    if not prefix:
-        return False
-    
-    # Get last 3 tokens
-    tokens = prefix.split()
-    window = tokens[-3:]
+    # Last 3 tokens before the match (whitespace-split, so no strip needed;
+    # rsplit stops after 3 splits instead of tokenising the whole prefix)
+    window = text_lower[:match_start].rsplit(None, 3)[-3:]
     
     for token in window:
         # Clean token from basic punctuation
@@ -155,18 +189,75 @@ def _is_negated(text_lower: str, match_start: int) -> bool:
     return False
 
 
-def _keyword_match_count(patterns: list, text_lower: str) -> int:
+def _build_keyword_counts():
     """
-    Count keyword matches using precompiled regex patterns.
-    Prevents false positives like 'I don't hate it' triggering on 'hate'.
-    Multi-word phrases (e.g. 'too hard', 'not fair') are supported.
+    Specialise _keyword_counts for the keyword table fixed at import: the index,
+    regex methods and mood keys are bound as closure cells, so the per-word
+    loop does no module-global or attribute lookups.
     """
-    count = 0
-    for pattern in patterns:
-        for match in pattern.finditer(text_lower):
-            if not _is_negated(text_lower, match.start()):
-                count += 1
-    return count
+    index_get = _KEYWORD_INDEX.get
+    word_runs = _WORD_RUN_RE.finditer
+    word_char_at = _WORD_CHAR_RE.match
+    is_negated = _is_negated
+    mood_keys = tuple(MOOD_KEYWORDS)
+    new_counts = dict.fromkeys
+
+    def _keyword_counts(text_lower: str) -> dict:
+        """
+        Count non-negated keyword matches for every mood in one pass over the text.
+        Matches are whole-word (\\b-bounded), so "no" never hits inside "know";
+        overlapping keywords ("thank" / "thank you") each count, and a keyword
+        preceded by a negation word within 3 words ("I don't hate it") is skipped.
+        """
+        counts = new_counts(mood_keys, 0)
+        text_len = len(text_lower)
+        for run in word_runs(text_lower):
+            candidates = index_get(run.group())
+            if candidates is None:
+                continue
+            start = run.start()
+            for kw, single_word, moods in candidates:
+                if not single_word:
+                    end = start + len(kw)
+                    if not text_lower.startswith(kw, start):
+                        continue
+                    if end < text_len and word_char_at(text_lower, end):
+                        continue
+                if is_negated(text_lower, start):
+                    continue
+                for mood in moods:
+                    counts[mood] += 1
+        return counts
+
+    return _keyword_counts
+
+
+_keyword_counts = _build_keyword_counts()
+
+
+def _utterance_rms(audio_frames) -> float:
+    """
+    RMS energy on a [-1, 1] scale, accumulated per frame: no concatenated
+    copy of the utterance and no squared temporary.
+    """
+    sum_sq = 0.0        # float frames, full scale = 1.0
+    sum_sq_pcm = 0      # int16 PCM frames, full scale = 32768
+    n_samples = 0
+    for frame in audio_frames:
+        flat = np.asarray(frame).ravel()
+        if flat.dtype == np.int16:
+            # Exact integer accumulator (int64: int32 overflows
+            # after a few hundred full-scale samples)
+            wide = flat.astype(np.int64)
+            sum_sq_pcm += int(np.dot(wide, wide))
+        else:
+            # No-op view for the float32 frames the STT loop records
+            flat = flat.astype(np.float32, copy=False)
+            sum_sq += float(np.dot(flat, flat))
+        n_samples += flat.size
+    if sum_sq_pcm:
+        sum_sq += sum_sq_pcm / _PCM16_FULL_SCALE_SQ
+    return math.sqrt(sum_sq / n_samples) if n_samples else 0.0
 
 
 class MoodDetector:
@@ -192,7 +283,12 @@ class MoodDetector:
             window = 3
         
         self.SMOOTHING_WINDOW = window
-        self._mood_history = deque(maxlen=window)
+        # Rolling window as a ring of parallel arrays (mood code, confidence)
+        # written in place each utterance instead of a deque of tuples
+        self._mood_buf = np.full(window, -1, dtype=np.int8)
+        self._conf_buf = np.zeros(window, dtype=np.float64)
+        self._wslot = 0                      # Next slot to overwrite (oldest once full)
+        self._valid_count = 0                # Filled slots, capped at the window size
         self._current_mood = Mood.NEUTRAL
         self._current_confidence = 0.0
         self._consecutive_neutral_count = 0  # For mood decay
@@ -204,22 +300,38 @@ class MoodDetector:
         Analyze mood from text and audio.
         
         Args:
-            text: Transcribed user speech
-            audio_frames: List of numpy audio frame arrays from the utterance
+            text: Transcribed user speech (str or a prebuilt Utterance)
+            audio_frames: List of numpy audio frame arrays from the utterance,
+                          or one contiguous ndarray of the whole utterance
+                          (used as-is, never copied)
             utterance_duration: Duration of the utterance in seconds
             
         Returns:
             Tuple of (mood: str, confidence: float)
         """
-        text_mood, text_conf = self._analyze_text(text)
-        audio_mood, audio_conf = self._analyze_audio(audio_frames, text, text_mood, utterance_duration)
+        utterance = text if isinstance(text, Utterance) else Utterance.from_text(text)
+        if isinstance(audio_frames, np.ndarray):
+            # A single contiguous buffer is one "frame" for the RMS loop
+            audio_frames = (audio_frames,) if audio_frames.size else ()
+        text_mood, text_conf = self._analyze_text(utterance)
         
-        # Combine signals: text has higher weight (0.6) than audio (0.4)
-        # because keyword detection is more reliable than prosody alone
-        combined = self._combine_signals(text_mood, text_conf, audio_mood, audio_conf)
+        if not audio_frames:
+            # Text-only input: _combine_signals would return text as-is
+            combined = (text_mood, text_conf)
+        else:
+            audio_mood, audio_conf = self._analyze_audio(audio_frames, utterance, text_mood, utterance_duration)
+            
+            # Combine signals: text has higher weight (0.6) than audio (0.4)
+            # because keyword detection is more reliable than prosody alone
+            combined = self._combine_signals(text_mood, text_conf, audio_mood, audio_conf)
         
         # Temporal smoothing
-        self._mood_history.append(combined)
+        slot = self._wslot
+        self._mood_buf[slot] = _MOOD_INDEX[combined[0]]
+        self._conf_buf[slot] = combined[1]
+        self._wslot = (slot + 1) % self.SMOOTHING_WINDOW
+        if self._valid_count < self.SMOOTHING_WINDOW:
+            self._valid_count += 1
         
         # High-confidence bypass: if this reading is strong and different from
         # current mood, switch immediately instead of waiting for smoothing.
@@ -257,28 +369,66 @@ class MoodDetector:
         
         return self._current_mood, self._current_confidence
 
+    def analyze_batch(self, texts) -> list:
+        """
+        Raw text-only (mood, confidence) readings for many utterances, e.g. offline
+        transcript evaluation. Unlike analyze() this does not touch the smoothing
+        window or current mood, and identical utterances are scored once per batch.
+        """
+        readings = {}
+        results = []
+        for text in texts:
+            utterance = text if isinstance(text, Utterance) else Utterance.from_text(text)
+            reading = readings.get(utterance.text_lower)
+            if reading is None:
+                reading = readings[utterance.text_lower] = self._analyze_text(utterance)
+            results.append(reading)
+        return results
+
     def get_current_mood(self) -> tuple:
         """Returns the current smoothed mood and confidence."""
         return self._current_mood, self._current_confidence
 
-    def _analyze_text(self, text: str) -> tuple:
+    def get_mood_history(self) -> list:
+        """Returns the (mood, confidence) readings in the smoothing window, oldest first."""
+        return [(_MOODS[self._mood_buf[i]], float(self._conf_buf[i])) for i in self._window_order()]
+
+    def reset_history(self):
+        """Clears the smoothing window."""
+        self._mood_buf.fill(-1)
+        self._conf_buf.fill(0.0)
+        self._wslot = 0
+        self._valid_count = 0
+
+    def _window_order(self) -> list:
+        """Ring indices of the filled window slots, oldest first."""
+        window = self.SMOOTHING_WINDOW
+        if self._valid_count < window:
+            return list(range(self._valid_count))
+        start = self._wslot
+        return [(start + k) % window for k in range(window)]
+
+    def _analyze_text(self, utterance: Utterance) -> tuple:
         """
         Detect mood from transcribed text using word-boundary regex matching.
         Returns (mood, confidence).
         """
-        if not text or not text.strip():
+        text_lower = utterance.text_lower
+        if not text_lower:
             return Mood.QUIET, 0.5
         
-        text_lower = text.lower().strip()
-        word_count = len(text_lower.split())
+        word_count = utterance.word_count
+        
+        if _SCORABLE_CHAR_RE.search(text_lower) is None:
+            # Same neutral readings the short/full branches give with no match
+            return Mood.NEUTRAL, (0.3 if word_count <= SHORT_UTTERANCE_WORDS else 0.5)
         
         # Short utterance handling — check specific keywords before defaulting to QUIET/NEUTRAL
         if word_count <= SHORT_UTTERANCE_WORDS:
             cleaned = text_lower.rstrip(".!?")
             
             # 1. Positive short response (common affirmations)
-            positive_shorts = {"yes", "yeah", "okay", "ok", "good", "sure", "yay", "hi", "hello", "cool", "nice"}
-            if cleaned in positive_shorts:
+            if cleaned in _POSITIVE_SHORTS:
                 return Mood.HAPPY, 0.4
             
             # 2. Check full keyword lists for ALL moods even in short utterances
@@ -286,29 +436,28 @@ class MoodDetector:
             best_mood = None
             best_score = 0
             
-            for mood, patterns in PRECOMPILED_PATTERNS.items():
-                if _keyword_match_count(patterns, text_lower) > 0:
+            for mood, matches in _keyword_counts(text_lower).items():
+                if matches > 0:
                     # In short utterances, any match is significant
                     return mood, 0.5
             
             # No signal — default to neutral (low confidence) instead of quiet 
             # unless it's truly silent/filler-like "um", "uh".
-            fillers = {"um", "uh", "hmm", "well", "ah"}
-            if cleaned in fillers:
+            if cleaned in _SHORT_FILLERS:
                 return Mood.QUIET, 0.35
                 
             return Mood.NEUTRAL, 0.3
         
-        # Full utterance: count keyword matches using precompiled regex patterns
-        scores = {mood: 0 for mood in PRECOMPILED_PATTERNS.keys()}
-        for mood, patterns in PRECOMPILED_PATTERNS.items():
-            matches = _keyword_match_count(patterns, text_lower)
-            # Normalize by keyword list length for fair comparison
-            scores[mood] = matches / len(MOOD_KEYWORDS[mood]) if MOOD_KEYWORDS[mood] else 0
-        
-        # Find the dominant mood
-        best_mood = max(scores, key=scores.get)
-        best_score = scores[best_mood]
+        # Full utterance: count keyword matches for all moods in a single pass
+        # and keep the dominant one as we go (first mood wins ties, as max() did)
+        best_mood = None
+        best_score = 0.0
+        for mood, matches in _keyword_counts(text_lower).items():
+            if matches:
+                # Normalize by keyword list length for fair comparison
+                score = matches * _NORM[mood]
+                if score > best_score:
+                    best_mood, best_score = mood, score
         
         if best_score == 0:
             return Mood.NEUTRAL, 0.5
@@ -319,7 +468,7 @@ class MoodDetector:
         
         return best_mood, confidence
 
-    def _analyze_audio(self, audio_frames: list, text: str, text_mood: str, utterance_duration: float) -> tuple:
+    def _analyze_audio(self, audio_frames, utterance: Utterance, text_mood: str, utterance_duration: float) -> tuple:
         """
         Detect mood from audio prosody (volume, speaking rate).
         Uses text_mood to disambiguate loud audio signals.
@@ -328,54 +477,51 @@ class MoodDetector:
         if not audio_frames:
             return Mood.NEUTRAL, 0.0
         
+        # RMS energy (volume); only the numpy reduction over caller-supplied
+        # frames can fail on malformed input
         try:
-            # Concatenate all frames
-            full_audio = np.concatenate(audio_frames).flatten()
-            
-            # RMS energy (volume)
-            rms = np.sqrt(np.mean(full_audio**2))
-            
-            # Speaking rate (words per second) with safety caps
-            word_count = len(text.split()) if text else 0
-            if utterance_duration >= MIN_DURATION_FOR_RATE and word_count > 0:
-                speaking_rate = min(word_count / utterance_duration, MAX_SPEAKING_RATE)
-                # Smooth with previous rate to reduce spikes
-                speaking_rate = (speaking_rate + self._last_speaking_rate) / 2.0 if self._last_speaking_rate > 0 else speaking_rate
-                self._last_speaking_rate = speaking_rate
-            else:
-                # Duration too short for reliable rate — ignore
-                speaking_rate = 0
-            
-            # Volume-based mood — disambiguated with text mood (no bias)
-            if rms > LOUD_RMS_THRESHOLD:
-                if text_mood == Mood.HAPPY:
-                    return Mood.HAPPY, 0.35
-                elif text_mood == Mood.FRUSTRATED:
-                    return Mood.FRUSTRATED, 0.4
-                else:
-                    # Loud but unclear — lean toward anxious (lower confidence)
-                    return Mood.ANXIOUS, 0.25
-            
-            elif rms < QUIET_RMS_THRESHOLD:
-                # Very quiet — only SAD if text has negative keywords
-                # Otherwise QUIET (a calm child is not a sad child)
-                if text_mood in (Mood.SAD, Mood.FRUSTRATED, Mood.ANXIOUS):
-                    return Mood.SAD, 0.35
-                else:
-                    return Mood.QUIET, 0.25
-            
-            # Speaking rate signals (only if rate is valid)
-            if speaking_rate > 0:
-                if speaking_rate > FAST_WORDS_PER_SEC:
-                    return Mood.ANXIOUS, 0.3
-                elif speaking_rate < SLOW_WORDS_PER_SEC:
-                    return Mood.SAD, 0.25
-            
-            return Mood.NEUTRAL, 0.2
-            
-        except Exception as e:
+            rms = _utterance_rms(audio_frames)
+        except (TypeError, ValueError) as e:
             logging.warning(f"[MoodDetector] Audio analysis error: {e}")
             return Mood.NEUTRAL, 0.0
+        
+        # Speaking rate (words per second) with safety caps
+        word_count = utterance.word_count
+        if utterance_duration >= MIN_DURATION_FOR_RATE and word_count > 0:
+            speaking_rate = min(word_count / utterance_duration, MAX_SPEAKING_RATE)
+            # Smooth with previous rate to reduce spikes
+            speaking_rate = (speaking_rate + self._last_speaking_rate) / 2.0 if self._last_speaking_rate > 0 else speaking_rate
+            self._last_speaking_rate = speaking_rate
+        else:
+            # Duration too short for reliable rate — ignore
+            speaking_rate = 0
+        
+        # Volume-based mood — disambiguated with text mood (no bias)
+        if rms > LOUD_RMS_THRESHOLD:
+            if text_mood == Mood.HAPPY:
+                return Mood.HAPPY, 0.35
+            elif text_mood == Mood.FRUSTRATED:
+                return Mood.FRUSTRATED, 0.4
+            else:
+                # Loud but unclear — lean toward anxious (lower confidence)
+                return Mood.ANXIOUS, 0.25
+        
+        elif rms < QUIET_RMS_THRESHOLD:
+            # Very quiet — only SAD if text has negative keywords
+            # Otherwise QUIET (a calm child is not a sad child)
+            if text_mood in (Mood.SAD, Mood.FRUSTRATED, Mood.ANXIOUS):
+                return Mood.SAD, 0.35
+            else:
+                return Mood.QUIET, 0.25
+        
+        # Speaking rate signals (only if rate is valid)
+        if speaking_rate > 0:
+            if speaking_rate > FAST_WORDS_PER_SEC:
+                return Mood.ANXIOUS, 0.3
+            elif speaking_rate < SLOW_WORDS_PER_SEC:
+                return Mood.SAD, 0.25
+        
+        return Mood.NEUTRAL, 0.2
 
     def _combine_signals(self, text_mood: str, text_conf: float, audio_mood: str, audio_conf: float) -> tuple:
         """
@@ -417,28 +563,27 @@ class MoodDetector:
         Apply temporal smoothing: only change mood if 2 of 3 recent readings agree.
         This prevents mood flickering from a single utterance.
         """
-        if not self._mood_history:
+        window_size = self._valid_count
+        if not window_size:
             return Mood.NEUTRAL, 0.0
         
         # Count occurrences of each mood in the window
-        mood_counts = {}
-        mood_total_conf = {}
-        
-        for mood, conf in self._mood_history:
-            mood_counts[mood] = mood_counts.get(mood, 0) + 1
-            mood_total_conf[mood] = mood_total_conf.get(mood, 0.0) + conf
+        codes = self._mood_buf[:window_size]
+        counts = np.bincount(codes, minlength=len(_MOODS))
+        dominant_count = int(counts.max())
         
-        # Find the most common mood
-        dominant_mood = max(mood_counts, key=mood_counts.get)
-        dominant_count = mood_counts[dominant_mood]
+        # Most common mood; ties go to the earliest reading in the window
+        for i in self._window_order():
+            dominant = int(self._mood_buf[i])
+            if counts[dominant] == dominant_count:
+                break
         
         # Require at least 2 out of 3 (or 1 out of 1 for first utterance)
-        window_size = len(self._mood_history)
         required = max(1, (window_size + 1) // 2)  # majority: 1/1, 1/2, 2/3
         
         if dominant_count >= required:
-            avg_conf = mood_total_conf[dominant_mood] / dominant_count
-            return dominant_mood, avg_conf
+            avg_conf = float(self._conf_buf[:window_size][codes == dominant].sum()) / dominant_count
+            return _MOODS[dominant], avg_conf
         else:
             # No consensus — stay neutral
             return self._current_mood, self._current_confidence * 0.9  # Slight decay
@@ -19,10 +19,10 @@ Design principles:
 """
 
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class RecoveryStrategy:
     """
     Behavioral parameters that control how LaRa responds.
@@ -194,6 +194,26 @@ STRATEGIES_LOW_CONF = {
 }
 
 
+def _clamped(strategy: RecoveryStrategy) -> RecoveryStrategy:
+    """Safety: task difficulty never drops below -1."""
+    if strategy.task_difficulty_modifier >= -1:
+        return strategy
+    return replace(
+        strategy,
+        instruction_depth=max(strategy.instruction_depth, 1),
+        task_difficulty_modifier=-1,
+        label=strategy.label + "_clamped",
+    )
+
+
+# Resolved lookup: [confidence >= threshold][mood] -> clamped strategy.
+# Strategies are immutable, so clamping happens once here instead of per call.
+_STRATEGY_TABLE = (
+    {mood: _clamped(s) for mood, s in STRATEGIES_LOW_CONF.items()},
+    {mood: _clamped(s) for mood, s in STRATEGIES.items()},
+)
+
+
 class RecoveryStrategyManager:
     """
     Translates mood + confidence into a RecoveryStrategy.
@@ -217,26 +237,10 @@ class RecoveryStrategyManager:
         Returns the appropriate RecoveryStrategy for the given mood and confidence.
         Conservative at low confidence, full adaptation at high confidence.
         """
-        # Select strategy table based on confidence
-        if confidence < self.CONFIDENCE_THRESHOLD_FULL:
-            strategy_table = STRATEGIES_LOW_CONF
-        else:
-            strategy_table = STRATEGIES
-        
-        # Look up strategy (fall back to neutral if unknown mood)
-        strategy = strategy_table.get(mood, STRATEGIES["neutral"])
-        
-        # Safety: ensure task difficulty never drops below -1
-        if strategy.task_difficulty_modifier < -1:
-            strategy = RecoveryStrategy(
-                response_length_limit=strategy.response_length_limit,
-                instruction_depth=max(strategy.instruction_depth, 1),
-                tts_length_scale=strategy.tts_length_scale,
-                reassurance_level=strategy.reassurance_level,
-                task_difficulty_modifier=-1,
-                prompt_addition=strategy.prompt_addition,
-                label=strategy.label + "_clamped"
-            )
+        # Conservative table below the threshold, full table above;
+        # unknown moods fall back to neutral
+        table = _STRATEGY_TABLE[confidence >= self.CONFIDENCE_THRESHOLD_FULL]
+        strategy = table.get(mood) or table["neutral"]
         
         # Log strategy change
         if strategy.label != self._previous_strategy.label:
@@ -42,6 +42,12 @@ class RegulationState:
 MAX_FRUSTRATION_STREAK = 5
 MAX_STABILITY_STREAK = 5
 
+# Normalized persistence per streak length, precomputed so each turn is a
+# clamp + index. Values are the exact i / MAX quotients the thresholds in
+# AttentionController were tuned against (i * (1/MAX) can land 1 ulp above).
+_FRUSTRATION_PERSISTENCE = tuple(i / MAX_FRUSTRATION_STREAK for i in range(MAX_FRUSTRATION_STREAK + 1))
+_STABILITY_PERSISTENCE = tuple(i / MAX_STABILITY_STREAK for i in range(MAX_STABILITY_STREAK + 1))
+
 
 def compute_regulation_state(session) -> RegulationState:
     """
@@ -59,21 +65,16 @@ def compute_regulation_state(session) -> RegulationState:
     if session is None:
         return RegulationState()
     
+    frustration = session.consecutive_frustration
+    stability = session.consecutive_stability
+
     # Normalize streaks to 0.0-1.0 range
-    frustration_persistence = min(
-        session.consecutive_frustration / MAX_FRUSTRATION_STREAK, 1.0
-    )
-    stability_persistence = min(
-        session.consecutive_stability / MAX_STABILITY_STREAK, 1.0
-    )
+    frustration_persistence = _FRUSTRATION_PERSISTENCE[min(frustration, MAX_FRUSTRATION_STREAK)]
+    stability_persistence = _STABILITY_PERSISTENCE[min(stability, MAX_STABILITY_STREAK)]
     
     # Emotional trend: stability pushes positive, frustration pushes negative
-    # Range: -1.0 (pure frustration) to +1.0 (pure stability)
-    total = session.consecutive_frustration + session.consecutive_stability
-    if total > 0:
-        trend = (session.consecutive_stability - session.consecutive_frustration) / total
-    else:
-        trend = 0.0
+    # Range: -1.0 (pure frustration) to +1.0 (pure stability); 0.0 with no streak
+    trend = (stability - frustration) / ((frustration + stability) or 1)
     
     reg = RegulationState(
         frustration_persistence=frustration_persistence,
@@ -86,9 +87,10 @@ def compute_regulation_state(session) -> RegulationState:
         difficulty_locked=session.difficulty_locked_turns > 0,
     )
     
+    # %-args: formatted only if a DEBUG handler is active (runs every turn)
     logging.debug(
-        f"[RegulationState] frustration={frustration_persistence:.2f} "
-        f"stability={stability_persistence:.2f} trend={trend:.2f}"
+        "[RegulationState] frustration=%.2f stability=%.2f trend=%.2f",
+        frustration_persistence, stability_persistence, trend,
     )
     
     return reg
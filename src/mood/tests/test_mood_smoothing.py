@@ -0,0 +1,94 @@
+"""
+Tests for MoodDetector's ring-buffer smoothing window: history order across
+wraparound, reset, and agreement with the original deque-based majority vote.
+"""
+import sys
+import os
+import random
+from collections import deque
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+import pytest
+
+from src.mood.mood_detector import MoodDetector, Mood
+
+MOODS = [Mood.NEUTRAL, Mood.HAPPY, Mood.SAD, Mood.FRUSTRATED, Mood.ANXIOUS, Mood.QUIET]
+
+
+@pytest.fixture
+def detector():
+    return MoodDetector()
+
+
+def feed(det, mood, conf):
+    """Run one text-only analyze() whose raw reading is (mood, conf)."""
+    det._analyze_text = lambda utterance: (mood, conf)
+    return det.analyze("x", [])
+
+
+def _reference_smooth(history, current_mood, current_conf):
+    """The deque + dict majority vote the ring buffer replaced."""
+    if not history:
+        return Mood.NEUTRAL, 0.0
+    counts, totals = {}, {}
+    for mood, conf in history:
+        counts[mood] = counts.get(mood, 0) + 1
+        totals[mood] = totals.get(mood, 0.0) + conf
+    dominant = max(counts, key=counts.get)
+    if counts[dominant] >= max(1, (len(history) + 1) // 2):
+        return dominant, totals[dominant] / counts[dominant]
+    return current_mood, current_conf * 0.9
+
+
+def test_history_is_oldest_first_across_wraparound(detector):
+    window = detector.SMOOTHING_WINDOW
+    fed = [(MOODS[i % len(MOODS)], 0.1 * (i % 3)) for i in range(window + 2)]
+    for mood, conf in fed:
+        feed(detector, mood, conf)
+    assert detector.get_mood_history() == fed[-window:]
+
+
+def test_partial_window_history(detector):
+    feed(detector, Mood.SAD, 0.3)
+    assert detector.get_mood_history() == [(Mood.SAD, 0.3)]
+
+
+def test_reset_history_empties_window(detector):
+    feed(detector, Mood.HAPPY, 0.3)
+    detector.reset_history()
+    assert detector.get_mood_history() == []
+    assert detector._smooth() == (Mood.NEUTRAL, 0.0)
+
+
+def test_majority_and_average_confidence(detector):
+    feed(detector, Mood.SAD, 0.2)
+    feed(detector, Mood.HAPPY, 0.1)
+    feed(detector, Mood.SAD, 0.3)
+    mood, conf = detector._smooth()
+    assert mood == Mood.SAD
+    assert conf == pytest.approx(0.25)
+
+
+def test_tie_goes_to_earliest_reading(detector):
+    detector.reset_history()
+    feed(detector, Mood.ANXIOUS, 0.1)
+    feed(detector, Mood.HAPPY, 0.1)
+    assert detector._smooth()[0] == Mood.ANXIOUS
+
+
+def test_matches_deque_reference_on_random_sequences(detector):
+    rng = random.Random(7)
+    history = deque(maxlen=detector.SMOOTHING_WINDOW)
+    for _ in range(2000):
+        # Low confidences keep analyze() off the high-confidence bypass
+        reading = (rng.choice(MOODS), round(rng.uniform(0.0, 0.39), 3))
+        feed(detector, *reading)
+        history.append(reading)
+        if rng.random() < 0.02:
+            detector.reset_history()
+            history.clear()
+        expected = _reference_smooth(history, detector._current_mood, detector._current_confidence)
+        mood, conf = detector._smooth()
+        assert mood == expected[0]
+        assert conf == pytest.approx(expected[1])
+        assert detector.get_mood_history() == list(history)
@@ -9,11 +9,13 @@ import sounddevice as sd
 import webrtcvad
 import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
-from faster_whisper import WhisperModel
-from src.utils.gpu_manager import get_device_and_compute_type, check_vram
+from src.utils.gpu_manager import get_device_and_compute_type, check_vram, configure_cpu_threads
 from src.core.PerformanceMonitor import PerformanceMonitor
+from src.core.metrics import Timer
 from src.events.event_bus import EventBus, EventType
+from src.perception.utterance import Utterance
 
 # Logging is already configured by main.py's setup_logging() — do NOT call basicConfig here
 
@@ -109,6 +111,8 @@ class STTService:
             raise RuntimeError("STTService is a singleton. Use STTService.get()")
             
         logging.info("[STTService] Initializing Faster-Whisper subsystem...")
+        # Deferred: faster_whisper pulls in CTranslate2 + CUDA probing, only needed once STT boots
+        from faster_whisper import WhisperModel
         from src.core.runtime_paths import get_whisper_dir
         try:
             from src.core.config_loader import CONFIG
@@ -128,13 +132,17 @@ class STTService:
             # Require at least 2GB of VRAM for the small.en Whisper + CTranslate2 runtime
             check_vram(2.0)
             
-        print(f"        [STT] Loading Faster-Whisper ({stt_model_name}) on {stt_device}...")
+        print(f"        [STT] Loading Faster-Whisper ({stt_model_name}) on {stt_device} [{stt_compute}]...")
         
         start_time = time.time()
+        # One model serves the main loop, wake-word clips and LLM audio input;
+        # CTranslate2 decoding on a shared model is not thread-safe.
+        self._transcribe_lock = threading.Lock()
         self.model = WhisperModel(
             stt_model_name, 
             device=stt_device, 
             compute_type=stt_compute, 
+            cpu_threads=configure_cpu_threads(),
             download_root=models_dir
         )
         
@@ -149,7 +157,7 @@ class STTService:
             logging.warning(f"[STTService] Warmup inference failed (benign): {e}")
             
         load_time = time.time() - start_time
-        logging.info(f"[STTService] Faster-Whisper {stt_model_name} initialized in {load_time:.2f}s")
+        logging.info(f"[STTService] Faster-Whisper {stt_model_name} ({stt_compute}) initialized in {load_time:.2f}s")
         
         STTService._instance = self
 
@@ -159,6 +167,12 @@ class STTService:
             STTService()
         return STTService._instance
 
+    def transcribe(self, audio, **kwargs):
+        """Serialised model.transcribe(); segments are decoded inside the lock."""
+        with self._transcribe_lock:
+            segments, info = self.model.transcribe(audio, **kwargs)
+            return list(segments), info
+
 
 # --- System Mode ---
 class SystemMode(Enum):
@@ -201,6 +215,22 @@ KWS_COOLDOWN_S = 1.5
 vad = webrtcvad.Vad(VAD_MODE)
 audio_queue = queue.Queue()
 
+# Noise gate compared on summed energy: rms > t  <=>  sum(x^2) > t^2 * n
+_GATE_ENERGY = NOISE_GATE_THRESHOLD * NOISE_GATE_THRESHOLD
+
+
+def frame_is_speech(frame) -> bool:
+    """
+    Noise gate + WebRTC VAD for one sounddevice frame in a single pass.
+    The gate runs first (one dot product, no temporaries) so silent frames
+    never reach the VAD. Raises if webrtcvad rejects the frame.
+    """
+    flat = frame.reshape(-1)
+    if float(np.dot(flat, flat)) <= _GATE_ENERGY * flat.size:
+        return False
+    pcm_data = (flat * 32767).astype(np.int16)
+    return vad.is_speech(pcm_data.tobytes(), SAMPLE_RATE)
+
 
 def callback(indata, frames, time_info, status):
     audio_queue.put(indata.copy())
@@ -239,6 +269,20 @@ def validate_response(text: str) -> str:
     return ' '.join(validated)
 
 
+def prepare_utterance(audio_frames) -> np.ndarray:
+    """
+    Shared Whisper front-end for STT and KWS clips: joins sounddevice frames
+    into one contiguous 1-D float32 buffer and peak-normalizes weak signals
+    in place (no flatten/astype/abs temporaries).
+    """
+    full_audio = np.concatenate(audio_frames, axis=0, dtype=np.float32).reshape(-1)
+    peak = max(float(full_audio.max()), -float(full_audio.min()))
+    # Normalize only weak signals
+    if 0 < peak < 0.5:
+        full_audio *= 1.0 / peak
+    return full_audio
+
+
 def check_wake_word_in_clip(audio_frames, kws_model):
     """
     Lightweight keyword spotting: runs tiny.en on a short audio clip
@@ -247,13 +291,7 @@ def check_wake_word_in_clip(audio_frames, kws_model):
     Returns True if 'lara' is found in the transcription.
     """
     try:
-        full_audio = np.concatenate(audio_frames).flatten().astype(np.float32)
-        
-        # Normalize only weak signals
-        peak = np.max(np.abs(full_audio))
-        if 0 < peak < 0.5:
-            full_audio = full_audio / peak
-        
+        full_audio = prepare_utterance(audio_frames)
         segments, _info = kws_model.transcribe(full_audio, beam_size=1, language="en")
         text = "".join([s.text for s in segments]).strip().lower()
         
@@ -279,7 +317,7 @@ def run_conversation_loop(bridge=None, skip_wake_word=False, session=None):
     
     # Retrieve singletons
     stt_service = STTService.get()
-    whisper_model = stt_service.model
+    whisper_model = stt_service  # transcribe() holds the shared model lock
     kws_model = whisper_model  # Reuse for wake-word detection on short clips
     
     from src.llm.AgentricTLM import LLMService
@@ -330,6 +368,10 @@ def run_conversation_loop(bridge=None, skip_wake_word=False, session=None):
         vector_memory = VectorMemory()
         vector_memory.set_user(USER_ID)
     
+    # Worker for per-turn stages that only depend on the transcript (RAG lookup),
+    # so they overlap with mood/regulation/strategy computation on the main thread.
+    turn_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="lara-turn")
+
     # State & Context Initialization (prevents UnboundLocalError)
     regulation = None
     strategy = None
@@ -418,13 +460,9 @@ def run_conversation_loop(bridge=None, skip_wake_word=False, session=None):
             if time.time() - kws_last_trigger_time < KWS_COOLDOWN_S:
                 continue
             
-            # VAD + Energy check on the frame (flattened for 1D calculation)
-            flat_data = indata.flatten()
-            rms = np.sqrt(np.mean(flat_data**2))
-            pcm_data = (flat_data * 32767).astype(np.int16)
-            
+            # VAD + Energy check on the frame
             try:
-                is_speech = vad.is_speech(pcm_data.tobytes(), SAMPLE_RATE) and rms > NOISE_GATE_THRESHOLD
+                is_speech = frame_is_speech(indata)
             except Exception:
                 continue
             
@@ -481,7 +519,10 @@ def run_conversation_loop(bridge=None, skip_wake_word=False, session=None):
     
 
     try:
+        # float32 pinned at ingestion: the VAD gate, prepare_utterance and the
+        # mood RMS all consume these frames without a dtype conversion
         with sd.InputStream(samplerate=SAMPLE_RATE, channels=CHANNELS, 
+                            dtype="float32",
                             callback=callback, blocksize=FRAME_SIZE,
                             latency='low'):
             while True:
@@ -493,13 +534,9 @@ def run_conversation_loop(bridge=None, skip_wake_word=False, session=None):
                     utterance_frames.pop(0)
                 
                 # --- Noise Clearance / Audio Pre-processing ---
-                # sounddevice returns 2D chunks (frames, channels), we need 1D for VAD and Whisper
-                flat_data = indata.flatten()
-                rms = np.sqrt(np.mean(flat_data**2))
-                pcm_data = (flat_data * 32767).astype(np.int16)
-                
+                # sounddevice returns 2D chunks (frames, channels); frame_is_speech flattens for VAD
                 try:
-                    is_speech = vad.is_speech(pcm_data.tobytes(), SAMPLE_RATE) and rms > NOISE_GATE_THRESHOLD
+                    is_speech = frame_is_speech(indata)
                 except Exception as e:
                     if logging.getLogger().isEnabledFor(logging.DEBUG):
                         logging.debug(f"[VAD] Frame error: {e}")
@@ -524,20 +561,16 @@ def run_conversation_loop(bridge=None, skip_wake_word=False, session=None):
                             perf = PerformanceMonitor.get()
                             perf.start_turn()
                             
-                            full_audio = np.concatenate(utterance_frames).flatten().astype(np.float32)
-                            
-                            # Normalize only weak signals
-                            peak = np.max(np.abs(full_audio))
-                            if 0 < peak < 0.5:
-                                full_audio = full_audio / peak
-                                
-                            segments, _info = whisper_model.transcribe(full_audio, beam_size=1, language="en")
-                            text = "".join([s.text for s in segments]).strip()
+                            full_audio = prepare_utterance(utterance_frames)
+                            with Timer("STT"):
+                                segments, _info = whisper_model.transcribe(full_audio, beam_size=1, language="en")
+                                text = "".join([s.text for s in segments]).strip()
                             
                             if not text: continue
+                            utterance = Utterance.from_text(text)   # Lowercased/split once per turn
 
                             # Handle Shutdown
-                            if "shutdown" in text.lower() or "shut down" in text.lower():
+                            if "shutdown" in utterance.text_lower or "shut down" in utterance.text_lower:
                                 _emit("session_ended", reason="shutdown_command", turn_count=session.turn_count if session else 0)
                                 goodbye = "Goodbye! Have a lovely day."
                                 print(f"\n\033[91m[Shutdown]\033[0m LaRa: {goodbye}")
@@ -548,7 +581,7 @@ def run_conversation_loop(bridge=None, skip_wake_word=False, session=None):
 
                             # Handle RESTING mode (only reached when launched without skip_wake_word)
                             if system_mode == SystemMode.RESTING:
-                                if "friday" in text.lower():
+                                if "friday" in utterance.text_lower:
                                     system_mode = SystemMode.LISTENING
                                     _emit("system_state", mode="listening", turn_count=0,
                                           difficulty=session.current_difficulty if session else 2)
@@ -576,6 +609,11 @@ def run_conversation_loop(bridge=None, skip_wake_word=False, session=None):
                             _emit("system_state", mode="thinking", turn_count=session.turn_count if session else 0, difficulty=session.current_difficulty if session else 2)
                             _emit("transcript", speaker="child", text=text, timestamp=time.time())
                             print(f"\n\033[94mYou:\033[0m {text}")
+
+                            # Start the vector-memory lookup now; it is independent of mood/strategy
+                            vector_future = None
+                            if vector_memory and VectorMemory and VectorMemory.is_story_trigger(utterance):
+                                vector_future = turn_executor.submit(vector_memory.get_context_for_llm, text)
                             
                             # Check session TTL
                             if session and session.is_expired():
@@ -588,9 +626,10 @@ def run_conversation_loop(bridge=None, skip_wake_word=False, session=None):
                             mood_conf = 0.0
                             if mood_detector and text:
                                 utterance_duration = len(utterance_frames) * FRAME_DURATION_MS / 1000.0
-                                detected_mood, mood_conf = mood_detector.analyze(
-                                    text, utterance_frames, utterance_duration
-                                )
+                                with Timer("Mood"):
+                                    detected_mood, mood_conf = mood_detector.analyze(
+                                        utterance, utterance_frames, utterance_duration
+                                    )
                                 # Publish EMOTION_UPDATE (Via Event Bus)
                                 EventBus.get().publish(EventType.EMOTION_UPDATE, {
                                     'mood': detected_mood,
@@ -705,8 +744,11 @@ def run_conversation_loop(bridge=None, skip_wake_word=False, session=None):
                             
                             # --- Vector Memory Retrieval (Section 16, RAG) ---
                             vector_context = ""
-                            if vector_memory and VectorMemory and VectorMemory.is_story_trigger(text):
-                                vector_context = vector_memory.get_context_for_llm(text)
+                            if vector_future is not None:
+                                try:
+                                    vector_context = vector_future.result()
+                                except Exception as e:
+                                    logging.warning(f"[VectorMemory] Retrieval failed: {e}")
                                 if vector_context:
                                     print(f"\033[90m[VectorMemory: recalled past story]\033[0m")
                             
@@ -757,9 +799,7 @@ def run_conversation_loop(bridge=None, skip_wake_word=False, session=None):
                                 try:
                                     peek_data = audio_queue.get_nowait()
                                     if len(peek_data) == FRAME_SIZE:
-                                        peek_rms = np.sqrt(np.mean(peek_data**2))
-                                        peek_pcm = (peek_data * 32767).astype(np.int16)
-                                        if vad.is_speech(peek_pcm.tobytes(), SAMPLE_RATE) and peek_rms > NOISE_GATE_THRESHOLD:
+                                        if frame_is_speech(peek_data):
                                             barge_in_count += 1
                                             if barge_in_count >= BARGE_IN_FRAME_THRESHOLD:
                                                 interrupted = True
@@ -847,7 +887,8 @@ def run_conversation_loop(bridge=None, skip_wake_word=False, session=None):
                                         logging.warning(f"[STT] DB Turn Sync publishing failed: {e}")
                                     
                                     perf.start_timer("tts")
-                                    completed = speak_and_monitor(full_ai_response.strip())
+                                    with Timer("TTS"):
+                                        completed = speak_and_monitor(full_ai_response.strip())
                                     perf.end_timer("tts")
                                     perf.end_turn()
                                     
@@ -882,6 +923,10 @@ def run_conversation_loop(bridge=None, skip_wake_word=False, session=None):
         else:
             logging.critical(f"System Error: {e}")
             print(f"\n\033[91mError:\033[0m {e}")
+    finally:
+        turn_executor.shutdown(wait=False)
+        if vector_memory:
+            vector_memory.flush()   # Persist summaries still queued for the batch writer
 
 if __name__ == "__main__":
     run_conversation_loop()
@@ -0,0 +1,31 @@
+"""
+LaRa Utterance
+One transcribed child utterance, normalised once after STT.
+
+The mood detector and story-trigger check both need the lowercased text and
+its word count; carrying them here avoids re-lowering and re-splitting the
+transcript at every consumer.
+"""
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class Utterance:
+    """Transcript plus its lowercased form and word tokens."""
+    text: str
+    text_lower: str
+    words: tuple
+
+    @classmethod
+    def from_text(cls, text: str) -> "Utterance":
+        text = text or ""
+        text_lower = text.lower().strip()
+        return cls(text=text, text_lower=text_lower, words=tuple(text_lower.split()))
+
+    @property
+    def word_count(self) -> int:
+        return len(self.words)
+
+    def __str__(self) -> str:
+        return self.text
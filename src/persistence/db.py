@@ -78,6 +78,30 @@ class Database:
             if conn:
                 conn.close()
 
+    def execute_many(self, query, seq_params):
+        """Execute a query once per params tuple in one transaction. Returns affected rows count."""
+        if not self.pool:
+            logging.error("[DB] No connection pool available.")
+            return None
+        
+        conn = None
+        try:
+            conn = self.pool.get_connection()
+            cursor = conn.cursor()
+            cursor.executemany(query, seq_params)
+            conn.commit()
+            result = cursor.rowcount
+            cursor.close()
+            return result
+        except Exception as e:
+            logging.error(f"[DB] ExecuteMany failed: {query} | Error: {e}")
+            if conn:
+                conn.rollback()
+            return None
+        finally:
+            if conn:
+                conn.close()
+
     def fetch_one(self, query, params=None):
         """Fetch a single row as a dictionary."""
         if not self.pool:
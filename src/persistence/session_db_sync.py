@@ -272,25 +272,27 @@ class SessionDBSync:
 
     def _persist_reinforcement_metrics(self, session_id, child_id, items):
         if not items: return
-        for item in items:
-            query = """
-                INSERT INTO child_reinforcement_metrics (
-                    session_id, child_id, style_name, total_uses, success_count,
-                    success_rate, total_events, last_used_at
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, NOW())
-                ON DUPLICATE KEY UPDATE
-                    session_id = VALUES(session_id),
-                    total_uses = total_uses + VALUES(total_uses),
-                    success_count = success_count + VALUES(success_count),
-                    total_events = total_events + VALUES(total_events),
-                    success_rate = (success_count + VALUES(success_count)) / (total_uses + VALUES(total_uses)),
-                    last_used_at = NOW()
-            """
-            params = (
+        query = """
+            INSERT INTO child_reinforcement_metrics (
+                session_id, child_id, style_name, total_uses, success_count,
+                success_rate, total_events, last_used_at
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, NOW())
+            ON DUPLICATE KEY UPDATE
+                session_id = VALUES(session_id),
+                total_uses = total_uses + VALUES(total_uses),
+                success_count = success_count + VALUES(success_count),
+                total_events = total_events + VALUES(total_events),
+                success_rate = (success_count + VALUES(success_count)) / (total_uses + VALUES(total_uses)),
+                last_used_at = NOW()
+        """
+        # One connection and one commit for all styles instead of one per row
+        self.db.execute_many(query, [
+            (
                 session_id, child_id, item.get("style_name"), item.get("total_uses"), item.get("success_count"),
                 item.get("success_rate"), item.get("total_uses")
             )
-            self.db.execute(query, params)
+            for item in items
+        ])
 
     def _persist_session_analytics(self, session_id, child_id, data):
         if not data: return
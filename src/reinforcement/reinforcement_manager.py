@@ -106,6 +106,11 @@ class ReinforcementAdaptationManager:
         self._baseline_style = ReinforcementStyle.CALM_VALIDATION
         self._style_changed_this_session = False
         self._style_locked = False
+        # Sum of total_count across styles, kept in step by update_metrics
+        self._total_events = 0
+        # _find_best_style result, reused until metrics or current style change
+        self._cached_best_style = None
+        self._best_style_dirty = True
         
         logging.info("[Reinforcement] Manager initialized.")
     
@@ -125,6 +130,7 @@ class ReinforcementAdaptationManager:
         # Load historical metrics from DB if available
         if self._memory:
             self._load_historical_metrics(user_id)
+        self._best_style_dirty = True
         
         logging.info(
             f"[Reinforcement] User: {user_id} | "
@@ -149,10 +155,13 @@ class ReinforcementAdaptationManager:
             return self._current_style
         
         # Check if we have enough data to consider adapting
-        total_events = sum(m.total_count for m in self._session_metrics.values())
+        total_events = self._total_events
         
         if total_events >= MIN_EVENTS_FOR_CHANGE and not self._style_changed_this_session:
-            best_style = self._find_best_style()
+            if self._best_style_dirty:
+                self._cached_best_style = self._find_best_style()
+                self._best_style_dirty = False
+            best_style = self._cached_best_style
             
             if best_style and best_style != self._current_style:
                 old = self._current_style
@@ -186,11 +195,14 @@ class ReinforcementAdaptationManager:
         metrics.total_count += 1
         if outcome_stable:
             metrics.success_count += 1
+        self._total_events += 1
+        self._best_style_dirty = True
         
+        # %-args: formatted only if a DEBUG handler is active (runs every turn)
         logging.debug(
-            f"[Reinforcement] {reinforcement_type}: "
-            f"{metrics.success_count}/{metrics.total_count} "
-            f"({metrics.success_rate:.0%} success)"
+            "[Reinforcement] %s: %d/%d (%.0f%% success)",
+            reinforcement_type, metrics.success_count, metrics.total_count,
+            100 * metrics.success_count / metrics.total_count,
         )
     
     def _find_best_style(self) -> Optional[str]:
@@ -224,7 +236,7 @@ class ReinforcementAdaptationManager:
         
         try:
             row = self._memory._conn.execute(
-                "SELECT * FROM reinforcement_metrics WHERE user_id = ?",
+                "SELECT preferred_style FROM reinforcement_metrics WHERE user_id = ?",
                 (user_id,)
             ).fetchone()
             
@@ -271,7 +283,7 @@ class ReinforcementAdaptationManager:
             """, (
                 self._user_id,
                 self._current_style,
-                sum(m.total_count for m in self._session_metrics.values()),
+                self._total_events,
                 __import__('time').time()
             ))
             self._memory._conn.commit()
@@ -5,7 +5,7 @@ Centralized initialization for model singletons.
 
 import os
 import logging
-from src.utils.gpu_manager import configure_gpu
+from src.utils.gpu_manager import configure_cpu_threads, configure_gpu
 
 def initialize():
     """
@@ -15,6 +15,9 @@ def initialize():
     """
     logging.info("[Bootstrap] Starting LaRa initialization sequence...")
     
+    # Thread budget first: OMP/MKL env vars only apply if set before torch loads
+    configure_cpu_threads()
+
     # Secure GPU environment variables
     configure_gpu()
     
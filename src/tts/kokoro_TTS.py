@@ -6,8 +6,13 @@ Features: Interruptible playback, listening lock, duration logging, echo cooldow
 
 import os
 import time
+import queue
 import logging
 import threading
+import hashlib
+import heapq
+import contextlib
+from collections import OrderedDict
 import numpy as np
 import sounddevice as sd
 
@@ -22,6 +27,24 @@ class LaRaSpeech:
     # Cooldown: ignore repeated interrupt triggers within this window
     INTERRUPT_COOLDOWN_S = 1.0
 
+    # Finish-up guard: once synthesis is done, don't cut off an utterance with
+    # less than this much audio left — letting it end is less jarring.
+    FINISH_UP_S = 2.0
+    SAMPLE_RATE = 24000
+
+    # Synthesis runs ahead of playback by at most this many chunks: the next
+    # chunk is ready before the current one finishes, without burning compute
+    # on chunks an interrupt would discard.
+    PREFETCH_CHUNKS = 2
+
+    # Synthesized-PCM cache for repeated phrases ("I am here with you." etc.).
+    # A phrase is only cached the second time it is spoken, so one-off LLM
+    # replies never take up memory or disk.
+    TTS_CACHE_MAX_ENTRIES = 64
+    TTS_CACHE_MAX_SAMPLES = 24000 * 10  # Don't cache utterances longer than 10s
+    TTS_DISK_CACHE_MAX_ENTRIES = 128    # Oldest-used .npy files are pruned past this
+    TTS_SEEN_MAX_ENTRIES = 512          # Phrase keys remembered for the repeat check
+
     def __init__(self, voice='af_bella', repo_id='hexgrad/Kokoro-82M'):
         self.voice_id = voice
         self.is_speaking = False
@@ -29,23 +52,46 @@ class LaRaSpeech:
         self._last_interrupt_time = 0.0
         self._playback_lock = threading.Lock()
         self._current_stream = None
+        # Synthesized chunks waiting for the output callback (None = end of utterance).
+        # speak() produces into it while the PortAudio callback thread consumes.
+        self._audio_q = queue.Queue(maxsize=self.PREFETCH_CHUNKS)
+        self._cur_chunk = None
+        self._cur_pos = 0
+        # Playback progress for the finish-up guard (samples)
+        self._samples_queued = 0
+        self._samples_played = 0
+        self._synthesis_done = False
+        # (voice, speed, text digest) -> float32 PCM, LRU-ordered
+        self._tts_cache: OrderedDict[tuple, np.ndarray] = OrderedDict()
+        # Keys of phrases spoken once, LRU-ordered; a second request caches the PCM
+        self._seen_phrases: OrderedDict[tuple, None] = OrderedDict()
+        # On-disk copy of the same cache so repeated phrases survive restarts
+        self._cache_dir = None
         self.speed = 0.9  # Default speed, adjustable by recovery strategy
 
         # Lazy-load Kokoro to avoid import-time delays
         self.pipeline = None
         self._repo_id = repo_id
+        # Synthesis runs under torch.inference_mode once torch is available:
+        # no autograd tracking or tensor version-counter bumps per chunk.
+        self._inference_mode = contextlib.nullcontext
 
         try:
             from kokoro import KPipeline
+            import torch
+            self._inference_mode = torch.inference_mode
             from src.core.runtime_paths import get_tts_dir
             tts_dir = get_tts_dir()
+            self._cache_dir = os.path.join(tts_dir, "pcm_cache")
+            os.makedirs(self._cache_dir, exist_ok=True)
             self.pipeline = KPipeline(lang_code='a', repo_id=repo_id)
             logging.info(f"Successfully loaded Kokoro TTS (voice: {voice})")
             
             # Warm up TTS on startup (Fixes Latency 6)
             logging.info("[TTS Init] Running warmup synthesis...")
             try:
-                list(self.pipeline(" ", voice=self.voice_id, speed=self.speed))
+                with self._inference_mode():
+                    list(self.pipeline(" ", voice=self.voice_id, speed=self.speed))
                 logging.info("[TTS Init] Warmup complete.")
             except Exception as e:
                 logging.warning(f"[TTS Init] Warmup failed (benign): {e}")
@@ -65,16 +111,164 @@ class LaRaSpeech:
             logging.info("[TTS Interrupt] Suppressed — cooldown active.")
             return False
 
+        # Remaining audio is only known once the whole utterance is queued
+        if self._synthesis_done:
+            remaining = (self._samples_queued - self._samples_played) / self.SAMPLE_RATE
+            if remaining < self.FINISH_UP_S:
+                logging.info(f"[TTS Interrupt] Finish-up — {remaining:.1f}s left, not interrupting.")
+                return False
+
         self._interrupt_requested = True
         self._last_interrupt_time = now
 
         logging.info("[TTS Interrupt] Speech interrupted by wake-word.")
         return True
 
+    def _callback(self, outdata, frames, time_info, status):
+        """
+        PortAudio output callback: copies queued chunk samples into the device
+        buffer back-to-back (gapless) and stops within one block of an interrupt.
+        """
+        if self._interrupt_requested:
+            outdata.fill(0)
+            raise sd.CallbackStop
+
+        out = outdata[:, 0]
+        filled = 0
+        while filled < frames:
+            if self._cur_chunk is None or self._cur_pos >= len(self._cur_chunk):
+                try:
+                    chunk = self._audio_q.get_nowait()
+                except queue.Empty:
+                    break  # Synthesis is behind: pad with silence and keep the stream open
+                if chunk is None:
+                    out[filled:] = 0
+                    raise sd.CallbackStop
+                self._cur_chunk, self._cur_pos = chunk, 0
+            n = min(frames - filled, len(self._cur_chunk) - self._cur_pos)
+            out[filled:filled + n] = self._cur_chunk[self._cur_pos:self._cur_pos + n]
+            self._cur_pos += n
+            filled += n
+        out[filled:] = 0
+        self._samples_played += filled
+
+    def _enqueue(self, chunk, finished: threading.Event) -> bool:
+        """Blocking put that gives up on interrupt or if the stream has ended."""
+        while True:
+            try:
+                self._audio_q.put(chunk, timeout=0.05)
+                return True
+            except queue.Full:
+                if self._interrupt_requested or finished.is_set():
+                    return False
+
+    def _synthesize(self, text: str):
+        """Yield Kokoro output for text as contiguous 1-D float32 chunks."""
+        # Speed controlled by recovery strategy (default 0.9 for neurodiverse pacing)
+        for gs, ps, audio in self.pipeline(text, voice=self.voice_id, speed=self.speed):
+            # Amplitude check as one reduction, without materializing |audio|
+            if hasattr(audio, 'abs'):
+                # torch tensor: reduce on its device before the host copy;
+                # aminmax is one pass with no |audio| temporary
+                if audio.numel():
+                    lo, hi = audio.aminmax()
+                    max_amp = max(float(hi), -float(lo))
+                else:
+                    max_amp = 0.0
+                audio_np = audio.detach().cpu().numpy()
+            else:
+                audio_np = np.array(audio, dtype=np.float32)
+                max_amp = max(float(audio_np.max()), -float(audio_np.min())) if audio_np.size else 0.0
+            audio_np = np.ascontiguousarray(audio_np, dtype=np.float32).reshape(-1)
+
+            if max_amp > 0.99:
+                logging.warning(f"Audio amplitude spike detected ({max_amp:.3f}). Potential clipping.")
+
+            yield audio_np
+
+    def _cache_path(self, key: tuple):
+        """Disk location for a cache key, or None when the cache dir is unavailable."""
+        if self._cache_dir is None:
+            return None
+        voice, speed, digest = key
+        return os.path.join(self._cache_dir, f"{voice}_{speed:.3f}_{digest.hex()}.npy")
+
+    def _lookup_pcm(self, key: tuple):
+        """Return cached PCM for key from memory, falling back to the disk cache."""
+        pcm = self._tts_cache.get(key)
+        if pcm is not None:
+            self._tts_cache.move_to_end(key)
+            return pcm
+        path = self._cache_path(key)
+        if path is None or not os.path.exists(path):
+            return None
+        try:
+            pcm = np.load(path)
+            os.utime(path)  # mtime doubles as last-use time for pruning
+        except (OSError, ValueError) as e:
+            logging.warning(f"[TTS Cache] Dropping unreadable entry {path}: {e}")
+            with contextlib.suppress(OSError):
+                os.remove(path)
+            return None
+        self._remember_pcm(key, pcm)
+        return pcm
+
+    def _seen_before(self, key: tuple) -> bool:
+        """Record a cache miss for key; True if the phrase was already requested once."""
+        if key in self._seen_phrases:
+            self._seen_phrases.move_to_end(key)
+            return True
+        self._seen_phrases[key] = None
+        if len(self._seen_phrases) > self.TTS_SEEN_MAX_ENTRIES:
+            self._seen_phrases.popitem(last=False)
+        return False
+
+    def _remember_pcm(self, key: tuple, pcm: np.ndarray):
+        self._tts_cache[key] = pcm
+        if len(self._tts_cache) > self.TTS_CACHE_MAX_ENTRIES:
+            self._tts_cache.popitem(last=False)
+
+    def _cache_pcm(self, key: tuple, chunks: list):
+        """Store a fully spoken utterance in the LRU PCM cache and on disk."""
+        pcm = np.concatenate(chunks) if len(chunks) > 1 else chunks[0]
+        if len(pcm) > self.TTS_CACHE_MAX_SAMPLES:
+            return
+        self._remember_pcm(key, pcm)
+        path = self._cache_path(key)
+        if path is None:
+            return
+        # Write-then-rename so a crash never leaves a truncated entry behind
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                np.save(f, pcm)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.warning(f"[TTS Cache] Could not persist phrase: {e}")
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+            return
+        self._prune_disk_cache()
+
+    def _prune_disk_cache(self):
+        """Delete least-recently-used .npy entries beyond TTS_DISK_CACHE_MAX_ENTRIES."""
+        try:
+            with os.scandir(self._cache_dir) as it:
+                entries = [(e.stat().st_mtime, e.path) for e in it if e.name.endswith(".npy")]
+        except OSError:
+            return
+        excess = len(entries) - self.TTS_DISK_CACHE_MAX_ENTRIES
+        if excess <= 0:
+            return
+        for _, path in heapq.nsmallest(excess, entries):
+            with contextlib.suppress(OSError):
+                os.remove(path)
+
     def speak(self, text: str):
         """
         Synthesizes and plays text using Kokoro TTS with chunk-by-chunk streaming.
-        Checks for interrupt between each chunk for responsive wake-word detection.
+        Chunks are queued to a single callback OutputStream, which checks for
+        interrupts every audio block for responsive wake-word detection.
         Returns True if speech completed fully, False if interrupted.
         """
         if not text or not text.strip():
@@ -90,38 +284,52 @@ class LaRaSpeech:
         playback_start = time.time()
 
         try:
-            # Speed controlled by recovery strategy (default 0.9 for neurodiverse pacing)
-            generator = self.pipeline(text, voice=self.voice_id, speed=self.speed)
+            key = (self.voice_id, self.speed, hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest())
+            cached = self._lookup_pcm(key)
+            if cached is not None:
+                # Repeated phrase: replay stored PCM, no Kokoro forward pass
+                chunks, synthesized = (cached,), None
+            else:
+                # Only collect chunks for caching once the phrase has repeated
+                chunks = self._synthesize(text)
+                synthesized = [] if self._seen_before(key) else None
             
-            # Use isolated OutputStream to prevent global sd.stop() from killing the microphone
-            stream = sd.OutputStream(samplerate=24000, channels=1)
-            stream.start()
-
-            for i, (gs, ps, audio) in enumerate(generator):
-                # Check for interrupt BEFORE playing each chunk
-                if self._interrupt_requested:
-                    was_interrupted = True
-                    break
-
-                # Convert tensor to numpy array (cross-platform safe)
-                audio_np = audio.numpy() if hasattr(audio, 'numpy') else np.array(audio, dtype=np.float32)
-
-                # Amplitude check
-                max_amp = np.max(np.abs(audio_np)) if len(audio_np) > 0 else 0
-                if max_amp > 0.99:
-                    logging.warning(f"Audio amplitude spike detected ({max_amp:.3f}). Potential clipping.")
+            # Fresh queue state for this utterance
+            while not self._audio_q.empty():
+                self._audio_q.get_nowait()
+            self._cur_chunk, self._cur_pos = None, 0
+            self._samples_queued = self._samples_played = 0
+            self._synthesis_done = False
+            finished = threading.Event()
 
-                # Play chunk synchronously on the stream. It blocks until played or broken.
-                stream.write(audio_np)
+            # Use isolated OutputStream to prevent global sd.stop() from killing the microphone.
+            # One callback-driven stream per utterance: chunks play gaplessly from the queue.
+            stream = sd.OutputStream(
+                samplerate=self.SAMPLE_RATE, channels=1, dtype='float32', blocksize=1024,
+                callback=self._callback, finished_callback=finished.set,
+            )
+            self._current_stream = stream
+            with stream, self._inference_mode():
+                for audio_np in chunks:
+                    # Check for interrupt BEFORE queueing each chunk
+                    if self._interrupt_requested:
+                        break
 
-                # If interrupt triggered during write/chunk transitions, abort
-                if self._interrupt_requested:
-                    was_interrupted = True
-                    break
+                    if synthesized is not None:
+                        synthesized.append(audio_np)
+                    if not self._enqueue(audio_np, finished):
+                        break
+                    self._samples_queued += len(audio_np)
 
-            # Gracefully close the isolated stream
-            stream.stop()
-            stream.close()
+                # End-of-utterance marker, then wait for the callback to drain the queue
+                if not self._interrupt_requested:
+                    self._synthesis_done = self._enqueue(None, finished)
+                while not finished.wait(0.05):
+                    if not stream.active:
+                        break
+            was_interrupted = self._interrupt_requested
+            if synthesized and not was_interrupted:
+                self._cache_pcm(key, synthesized)
 
             playback_duration = time.time() - playback_start
 
@@ -137,6 +345,8 @@ class LaRaSpeech:
             print(f"\n\033[91m[Audio Error]\033[0m Problem playing LaRa's voice: {e}")
 
         finally:
+            self._current_stream = None
+            self._synthesis_done = False
             self.is_speaking = False
             self._interrupt_requested = False
 
@@ -147,7 +357,7 @@ class LaRaSpeech:
         if self.is_speaking:
             self._interrupt_requested = True
             # DO NOT call sd.stop() here — it kills the microphone InputStream and causes a Bus Error.
-            # The 'self._interrupt_requested' flag tells the active OutputStream chunk loop to abort cleanly.
+            # The 'self._interrupt_requested' flag tells the OutputStream callback to stop cleanly.
 
 # --- SINGLETON TTS SERVICE ---
 class TTSService:
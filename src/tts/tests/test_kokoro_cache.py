@@ -0,0 +1,131 @@
+"""
+Tests for LaRaSpeech's synthesized-PCM cache and the finish-up interrupt
+guard (no Kokoro model or audio device is needed: the pipeline stays unloaded).
+"""
+import sys
+import os
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+import numpy as np
+import pytest
+
+pytest.importorskip("sounddevice")
+from src.tts.kokoro_TTS import LaRaSpeech
+
+
+@pytest.fixture
+def tts(tmp_path):
+    speech = LaRaSpeech()
+    speech._cache_dir = str(tmp_path)
+    return speech
+
+
+def _key(i):
+    return ("af_bella", 0.9, i.to_bytes(16, "big"))
+
+
+def _pcm(value, n=100):
+    return np.full(n, value, dtype=np.float32)
+
+
+# ── Repeat detection ─────────────────────────────────────────
+
+def test_phrase_is_cacheable_only_on_second_request(tts):
+    assert not tts._seen_before(_key(1))
+    assert tts._seen_before(_key(1))
+
+
+def test_seen_phrases_are_bounded_lru(tts, monkeypatch):
+    monkeypatch.setattr(LaRaSpeech, "TTS_SEEN_MAX_ENTRIES", 2)
+    tts._seen_before(_key(1))
+    tts._seen_before(_key(2))
+    tts._seen_before(_key(1))   # Refresh 1, so 2 is now the oldest
+    tts._seen_before(_key(3))
+    assert list(tts._seen_phrases) == [_key(1), _key(3)]
+
+
+# ── Memory cache ─────────────────────────────────────────────
+
+def test_memory_cache_evicts_least_recently_used(tts, monkeypatch):
+    monkeypatch.setattr(LaRaSpeech, "TTS_CACHE_MAX_ENTRIES", 2)
+    tts._cache_dir = None   # Memory only
+    tts._cache_pcm(_key(1), [_pcm(0.1)])
+    tts._cache_pcm(_key(2), [_pcm(0.2)])
+    assert tts._lookup_pcm(_key(1)) is not None   # Touch 1
+    tts._cache_pcm(_key(3), [_pcm(0.3)])
+    assert list(tts._tts_cache) == [_key(1), _key(3)]
+    assert tts._lookup_pcm(_key(2)) is None
+
+
+def test_chunks_are_joined_and_long_utterances_skipped(tts):
+    tts._cache_pcm(_key(1), [_pcm(0.1, 10), _pcm(0.2, 5)])
+    assert len(tts._lookup_pcm(_key(1))) == 15
+
+    tts._cache_pcm(_key(2), [_pcm(0.0, LaRaSpeech.TTS_CACHE_MAX_SAMPLES + 1)])
+    assert tts._lookup_pcm(_key(2)) is None
+    assert not os.path.exists(tts._cache_path(_key(2)))
+
+
+# ── Disk cache ───────────────────────────────────────────────
+
+def test_disk_cache_survives_restart(tts):
+    tts._cache_pcm(_key(1), [_pcm(0.5)])
+    tts._tts_cache.clear()
+    pcm = tts._lookup_pcm(_key(1))
+    np.testing.assert_array_equal(pcm, _pcm(0.5))
+    assert _key(1) in tts._tts_cache   # Promoted back into memory
+
+
+def test_disk_cache_prunes_oldest_used(tts, tmp_path, monkeypatch):
+    monkeypatch.setattr(LaRaSpeech, "TTS_DISK_CACHE_MAX_ENTRIES", 2)
+    tts._cache_pcm(_key(1), [_pcm(0.1)])
+    tts._cache_pcm(_key(2), [_pcm(0.2)])
+    old = time.time() - 100
+    os.utime(tts._cache_path(_key(1)), (old, old))
+    os.utime(tts._cache_path(_key(2)), (old + 10, old + 10))
+    tts._cache_pcm(_key(3), [_pcm(0.3)])
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        os.path.basename(tts._cache_path(k)) for k in (_key(2), _key(3))
+    )
+
+
+def test_unreadable_disk_entry_is_dropped(tts):
+    path = tts._cache_path(_key(1))
+    with open(path, "wb") as f:
+        f.write(b"not a numpy file")
+    assert tts._lookup_pcm(_key(1)) is None
+    assert not os.path.exists(path)
+
+
+# ── Finish-up guard ──────────────────────────────────────────
+
+def _playing(tts, queued_s, played_s, done=True):
+    tts._synthesis_done = done
+    tts._samples_queued = int(queued_s * LaRaSpeech.SAMPLE_RATE)
+    tts._samples_played = int(played_s * LaRaSpeech.SAMPLE_RATE)
+    tts._last_interrupt_time = 0.0
+    tts._interrupt_requested = False
+
+
+def test_interrupt_skipped_near_the_end(tts):
+    _playing(tts, queued_s=5.0, played_s=4.0)
+    assert tts.interrupt_speech() is False
+    assert not tts._interrupt_requested
+
+
+def test_interrupt_allowed_with_audio_left(tts):
+    _playing(tts, queued_s=5.0, played_s=1.0)
+    assert tts.interrupt_speech() is True
+    assert tts._interrupt_requested
+
+
+def test_interrupt_allowed_while_still_synthesizing(tts):
+    _playing(tts, queued_s=1.0, played_s=0.5, done=False)
+    assert tts.interrupt_speech() is True
+
+
+def test_interrupt_cooldown(tts):
+    _playing(tts, queued_s=5.0, played_s=1.0)
+    assert tts.interrupt_speech() is True
+    assert tts.interrupt_speech() is False
@@ -2,6 +2,41 @@ import os
 import logging
 import platform
 
+_CPU_THREADS = None
+
+def configure_cpu_threads() -> int:
+    """
+    Splits the cores this process may actually use (respecting affinity/cgroup
+    pinning) between the torch (Kokoro) and CTranslate2 (Whisper) runtimes so
+    they don't each spawn cpu_count() threads and oversubscribe.
+    Must run before torch is first imported. Returns the per-runtime thread count.
+    """
+    global _CPU_THREADS
+    if _CPU_THREADS is not None:
+        return _CPU_THREADS
+
+    try:
+        usable = len(os.sched_getaffinity(0))
+    except AttributeError:  # macOS / Windows
+        usable = os.cpu_count() or 1
+    per_runtime = max(1, usable // 2)
+
+    os.environ.setdefault("OMP_NUM_THREADS", str(per_runtime))
+    os.environ.setdefault("MKL_NUM_THREADS", str(per_runtime))
+    try:
+        import torch
+        torch.set_num_threads(per_runtime)
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            pass  # Already fixed once parallel work has started
+    except ImportError:
+        pass
+
+    logging.info(f"[GPU Manager] CPU threads: usable={usable} per_runtime={per_runtime}")
+    _CPU_THREADS = per_runtime
+    return per_runtime
+
 def configure_gpu():
     """
     Detects if CUDA is available and sets the CUDA_VISIBLE_DEVICES environment variable
@@ -52,5 +87,10 @@ def get_device_and_compute_type(config_device: str, config_compute: str) -> tupl
     if platform.system() == "Darwin" and device != "cpu":
         logging.warning("[GPU Manager] MacOS detected. Forcing CPU with int8 compute.")
         return "cpu", "int8"
+
+    # CTranslate2 has no fast float16 path on CPU — int8 dynamic quantization is the CPU default
+    if (device == "cpu" or config_device == "cpu") and "float16" in config_compute:
+        logging.info(f"[GPU Manager] {config_compute} is GPU-only. Using int8 compute on CPU.")
+        return "cpu", "int8"
         
     return device, config_compute